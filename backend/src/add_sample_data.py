@@ -2,15 +2,20 @@
 """
 Script to add sample property data to the ROR-STAY database
 """
-import asyncio
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
+from db_client import connect, run
+from datetime import datetime, timezone
+from pymongo import UpdateOne, WriteConcern
+from models import Coordinates, geo_point
+from property_service import add_search_fields
 
 # Database configuration
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "ror_stay_database")
 
+# Single timestamp shared by every sample property
+_NOW = datetime.now(timezone.utc)
+
 sample_properties = [
     {
         "title": "Modern 2BHK Apartment in Downtown",
@@ -43,8 +48,8 @@ sample_properties = [
             "https://picsum.photos/800/600?random=1",
             "https://picsum.photos/800/600?random=2"
         ],
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "created_at": _NOW,
+        "updated_at": _NOW
     },
     {
         "title": "Cozy 1BHK Studio Near University",
@@ -76,8 +81,8 @@ sample_properties = [
             "https://picsum.photos/800/600?random=3",
             "https://picsum.photos/800/600?random=4"
         ],
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "created_at": _NOW,
+        "updated_at": _NOW
     },
     {
         "title": "Luxury 3BHK Condo with Pool",
@@ -113,8 +118,8 @@ sample_properties = [
             "https://picsum.photos/800/600?random=6",
             "https://picsum.photos/800/600?random=7"
         ],
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "created_at": _NOW,
+        "updated_at": _NOW
     },
     {
         "title": "Budget-Friendly 1BHK Flat",
@@ -144,52 +149,49 @@ sample_properties = [
         "images": [
             "https://picsum.photos/800/600?random=8"
         ],
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "created_at": _NOW,
+        "updated_at": _NOW
     }
 ]
 
+def _seed_doc(property_doc: dict) -> dict:
+    """Add the GeoJSON location and lowercase search fields that searches and nearby queries rely on"""
+    doc = {**property_doc, "address": dict(property_doc["address"])}
+    doc["location"] = geo_point(Coordinates(**doc["coordinates"]))
+    return add_search_fields(doc)
+
 async def add_sample_data():
     """Add sample properties to the database"""
     try:
         # Connect to MongoDB
-        client = AsyncIOMotorClient(MONGO_URL)
-        db = client[DB_NAME]
-        properties_collection = db.properties
-        
-        # Check if properties already exist
-        existing_count = await properties_collection.count_documents({})
-        print(f"Current properties in database: {existing_count}")
-        
-        if existing_count > 0:
-            print("Properties already exist in database. Using existing properties.")
-            print("Listing current properties:")
-            
-            # List existing properties
-            properties = await properties_collection.find({}).to_list(length=None)
-            for i, prop in enumerate(properties, 1):
-                title = prop.get('title', 'No title')
-                price = prop.get('price', 'No price')
-                address = prop.get('address', {})
-                city = address.get('city', 'No city')
-                state = address.get('state', 'No state')
-                print(f"  {i}. {title} - ${price}/month ({city}, {state})")
-            
-            print(f"\nTotal: {len(properties)} properties available")
-            return
-        
-        # Only insert sample properties if database is empty
-        result = await properties_collection.insert_many(sample_properties)
-        print(f"Successfully inserted {len(result.inserted_ids)} sample properties!")
-        
-        # Print inserted property titles
-        for i, prop in enumerate(sample_properties):
-            print(f"  {i+1}. {prop['title']} - ${prop['price']}/month")
-        
-        client.close()
-        
+        async with connect(MONGO_URL) as client:
+            db = client[DB_NAME]
+            properties_collection = db.properties
+
+            # Idempotent seed: insert each sample only if a property with that title is missing
+            seed_collection = properties_collection.with_options(
+                write_concern=WriteConcern(w=1, j=False)
+            )
+            ops = [
+                UpdateOne({"title": p["title"]}, {"$setOnInsert": _seed_doc(p)}, upsert=True)
+                for p in sample_properties
+            ]
+            result = await seed_collection.bulk_write(
+                ops,
+                ordered=False,
+                bypass_document_validation=True,
+                comment="seed:add_sample_data"
+            )
+            print(f"Successfully inserted {result.upserted_count} sample properties "
+                  f"({len(ops) - result.upserted_count} already present)")
+
+            # Print inserted property titles
+            for i, index in enumerate(sorted(result.upserted_ids), 1):
+                prop = sample_properties[index]
+                print(f"  {i}. {prop['title']} - ${prop['price']}/month")
+
     except Exception as e:
         print(f"Error adding sample data: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(add_sample_data())
+    run(add_sample_data)
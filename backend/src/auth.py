@@ -1,42 +1,132 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Set, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from models import User, UserInDB, UserCreate, UserLogin, TokenData, UserRole, generate_id, get_current_timestamp
-from config import get_settings, get_database
+from config import get_database, JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRATION_HOURS, PASSWORD_HASH_WORKERS
+import hashlib
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing (argon2id for new hashes; existing bcrypt hashes still verify)
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=2,
+)
+
+# Roles allowed to manage properties
+_AGENT_OR_ADMIN = frozenset({UserRole.ADMIN, UserRole.AGENT})
 
 # OAuth2 scheme
 security = HTTPBearer()
 
-settings = get_settings()
+# Default token lifetime
+_DEFAULT_EXP = timedelta(hours=JWT_EXPIRATION_HOURS)
+
+# Short-lived cache of verified tokens so hot tokens skip JWT decoding and the user lookup
+TOKEN_CACHE_TTL_SECONDS = 30
+TOKEN_CACHE_MAX_SIZE = 10000
+_token_cache: Dict[bytes, Tuple[float, User]] = {}
+_user_token_keys: Dict[str, Set[bytes]] = {}
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def _get_cached_user(key: bytes) -> Optional[User]:
+    entry = _token_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, user = entry
+    if expires_at <= time.monotonic():
+        _drop_cached_token(key)
+        return None
+    return user
+
+def _drop_cached_token(key: bytes) -> None:
+    entry = _token_cache.pop(key, None)
+    if entry is not None:
+        keys = _user_token_keys.get(entry[1].email)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del _user_token_keys[entry[1].email]
+
+def _cache_user(key: bytes, user: User, token_exp: Optional[float]) -> None:
+    ttl = TOKEN_CACHE_TTL_SECONDS
+    if token_exp is not None:
+        ttl = min(ttl, token_exp - time.time())
+    if ttl <= 0:
+        return
+    if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+        # Evict the oldest entry (dicts keep insertion order)
+        _drop_cached_token(next(iter(_token_cache)))
+    _token_cache[key] = (time.monotonic() + ttl, user)
+    _user_token_keys.setdefault(user.email, set()).add(key)
+
+def invalidate_user_tokens(email: str) -> None:
+    """Drop cached token verifications for a user after their role or status changes"""
+    for key in list(_user_token_keys.get(email, ())):
+        _drop_cached_token(key)
+
+async def ensure_user_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create the unique users indexes that back email/id lookups on every authenticated request"""
+    await db.users.create_index("email", unique=True)
+    await db.users.create_index("id", unique=True)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against its hash"""
+# Process pool for CPU-bound password hashing; started/stopped with the app.
+# Workers come from a forkserver (spawn where unavailable) rather than fork, so they never
+# inherit the Motor client's threads or sockets from the app process.
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_HASH_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+def start_hash_pool() -> None:
+    """Start the password hashing process pool"""
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context(_HASH_POOL_START_METHOD)
+        )
+
+def shutdown_hash_pool() -> None:
+    """Stop the password hashing process pool"""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
+def _hash_password_sync(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against its hash without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, _verify_password_sync, plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, _hash_password_sync, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(hours=settings.jwt_expiration_hours)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    expire = datetime.now(timezone.utc) + (expires_delta or _DEFAULT_EXP)
+    to_encode = {**data, "exp": expire}
+    encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
 async def get_user_by_email(db: AsyncIOMotorDatabase, email: str) -> Optional[UserInDB]:
@@ -55,12 +145,11 @@ async def get_user_by_email(db: AsyncIOMotorDatabase, email: str) -> Optional[Us
 async def get_user_by_id(db: AsyncIOMotorDatabase, user_id: str) -> Optional[User]:
     """Get user by ID from database"""
     try:
-        user_doc = await db.users.find_one({"id": user_id})
+        # Exclude sensitive fields server-side
+        user_doc = await db.users.find_one({"id": user_id}, {"hashed_password": 0})
         if user_doc:
             # Convert MongoDB document to User model
             user_doc["id"] = str(user_doc.pop("_id", user_doc.get("id")))
-            # Remove sensitive fields
-            user_doc.pop("hashed_password", None)
             return User(**user_doc)
         return None
     except Exception as e:
@@ -72,7 +161,7 @@ async def authenticate_user(db: AsyncIOMotorDatabase, email: str, password: str)
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return None
     return user
 
@@ -88,7 +177,7 @@ async def create_user(db: AsyncIOMotorDatabase, user_data: UserCreate) -> User:
             )
         
         # Create user document
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash(user_data.password)
         current_time = get_current_timestamp()
         
         user_doc = {
@@ -137,9 +226,16 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    token = credentials.credentials
+    cache_key = _token_cache_key(token)
+    cached_user = _get_cached_user(cache_key)
+    if cached_user is not None:
+        return cached_user
+    
+    # HS256 verification is a single HMAC (microseconds) and hits are cached above,
+    # so it stays on the event loop; an executor hop would cost more than the decode
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -151,8 +247,8 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
-    # Convert to User model (without sensitive information)
-    return User(
+    # Convert to User model (without sensitive information); UserInDB is already validated
+    current_user = User.model_construct(
         id=user.id,
         email=user.email,
         first_name=user.first_name,
@@ -163,6 +259,8 @@ async def get_current_user(
         created_at=user.created_at,
         updated_at=user.updated_at
     )
+    _cache_user(cache_key, current_user, payload.get("exp"))
+    return current_user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get the current active user"""
@@ -181,7 +279,7 @@ async def get_current_admin_user(current_user: User = Depends(get_current_active
 
 async def get_current_agent_or_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
     """Get the current user if they are an agent or admin"""
-    if current_user.role not in [UserRole.ADMIN, UserRole.AGENT]:
+    if current_user.role not in _AGENT_OR_ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions. Agent or Admin role required."
@@ -199,7 +297,7 @@ def is_agent(user: User) -> bool:
 
 def is_agent_or_admin(user: User) -> bool:
     """Check if user is an agent or admin"""
-    return user.role in [UserRole.ADMIN, UserRole.AGENT]
+    return user.role in _AGENT_OR_ADMIN
 
 # Admin functions
 async def promote_user_to_agent(db: AsyncIOMotorDatabase, user_id: str, admin_user: User) -> User:
@@ -235,6 +333,8 @@ async def promote_user_to_agent(db: AsyncIOMotorDatabase, user_id: str, admin_us
                 detail="Failed to retrieve updated user"
             )
         
+        invalidate_user_tokens(updated_user.email)
+        
         return updated_user
         
     except HTTPException:
@@ -279,6 +379,8 @@ async def deactivate_user(db: AsyncIOMotorDatabase, user_id: str, admin_user: Us
                 detail="Failed to retrieve updated user"
             )
         
+        invalidate_user_tokens(updated_user.email)
+        
         return updated_user
         
     except HTTPException:
@@ -2,9 +2,8 @@
 """
 Script to check existing properties in the database
 """
-import asyncio
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
+from db_client import connect, run
 
 # Database configuration
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
@@ -14,31 +13,44 @@ async def check_existing_properties():
     """Check what properties currently exist in the database"""
     try:
         # Connect to MongoDB
-        client = AsyncIOMotorClient(MONGO_URL)
-        db = client[DB_NAME]
-        properties_collection = db.properties
-        
-        count = await properties_collection.count_documents({})
-        print(f"Total properties in database: {count}")
-        
-        if count > 0:
-            properties = await properties_collection.find({}).to_list(length=None)
-            print("\nExisting properties:")
-            for i, prop in enumerate(properties, 1):
-                print(f"{i}. {prop.get('title', 'No title')} - ${prop.get('price', 'No price')}/month")
-                print(f"   Status: {prop.get('status', 'No status')}")
-                address = prop.get('address', {})
-                print(f"   Location: {address.get('city', 'No city')}, {address.get('state', 'No state')}")
-                print(f"   Bedrooms: {prop.get('bedrooms', 'N/A')}, Bathrooms: {prop.get('bathrooms', 'N/A')}")
-                print(f"   Square feet: {prop.get('square_feet', 'N/A')}")
-                print()
-        else:
-            print("No properties found in database.")
-        
-        client.close()
-        
+        async with connect(MONGO_URL) as client:
+            db = client[DB_NAME]
+            properties_collection = db.properties
+
+            count = await properties_collection.count_documents({})
+            print(f"Total properties in database: {count}")
+
+            if count > 0:
+                # Only pull the fields we print, in driver-sized batches
+                cursor = properties_collection.find(
+                    {},
+                    {
+                        "title": 1,
+                        "price": 1,
+                        "status": 1,
+                        "address.city": 1,
+                        "address.state": 1,
+                        "bedrooms": 1,
+                        "bathrooms": 1,
+                        "square_feet": 1,
+                    },
+                ).batch_size(200)
+                print("\nExisting properties:")
+                i = 0
+                async for prop in cursor:
+                    i += 1
+                    print(f"{i}. {prop.get('title', 'No title')} - ${prop.get('price', 'No price')}/month")
+                    print(f"   Status: {prop.get('status', 'No status')}")
+                    address = prop.get('address', {})
+                    print(f"   Location: {address.get('city', 'No city')}, {address.get('state', 'No state')}")
+                    print(f"   Bedrooms: {prop.get('bedrooms', 'N/A')}, Bathrooms: {prop.get('bathrooms', 'N/A')}")
+                    print(f"   Square feet: {prop.get('square_feet', 'N/A')}")
+                    print()
+            else:
+                print("No properties found in database.")
+
     except Exception as e:
         print(f"Error checking properties: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(check_existing_properties())
+    run(check_existing_properties)
@@ -1,59 +1,76 @@
-import os
 from typing import Optional
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from db_client import get_client
 
 class Settings(BaseSettings):
     # Database
-    mongo_url: str = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-    db_name: str = os.getenv("DB_NAME", "ror_stay_database")
+    mongo_url: str = "mongodb://localhost:27017"
+    db_name: str = "ror_stay_database"
     
     # CORS
-    cors_origins: str = os.getenv("CORS_ORIGINS", "*")
+    cors_origins: str = "*"
     
     # Authentication
-    jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "your-super-secret-jwt-key-change-in-production")
-    jwt_algorithm: str = os.getenv("JWT_ALGORITHM", "HS256")
-    jwt_expiration_hours: int = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
+    jwt_secret_key: str = "your-super-secret-jwt-key-change-in-production"
+    jwt_algorithm: str = "HS256"
+    jwt_expiration_hours: int = 24
+    # Password hashing processes per app worker (each uvicorn worker starts its own pool)
+    password_hash_workers: int = 2
     
     # Email Integration (SendGrid) - Optional for development
-    sendgrid_api_key: Optional[str] = os.getenv("SENDGRID_API_KEY")
-    sender_email: Optional[str] = os.getenv("SENDER_EMAIL", "dev@rorstay.local")
+    sendgrid_api_key: Optional[str] = None
+    sender_email: Optional[str] = "dev@rorstay.local"
     
     # Google Maps API - Optional for development
-    google_maps_api_key: Optional[str] = os.getenv("GOOGLE_MAPS_API_KEY")
+    google_maps_api_key: Optional[str] = None
+    google_maps_concurrency: int = 10
     
     # AWS S3 Configuration - Optional for development
-    aws_access_key_id: Optional[str] = os.getenv("AWS_ACCESS_KEY_ID")
-    aws_secret_access_key: Optional[str] = os.getenv("AWS_SECRET_ACCESS_KEY")
-    aws_bucket_name: Optional[str] = os.getenv("AWS_BUCKET_NAME")
-    aws_region: str = os.getenv("AWS_REGION", "us-east-1")
+    aws_access_key_id: Optional[str] = None
+    aws_secret_access_key: Optional[str] = None
+    aws_bucket_name: Optional[str] = None
+    aws_region: str = "us-east-1"
+    
+    # Redis cache - Optional, shared geocoding cache across workers
+    redis_url: Optional[str] = None
+    
+    # In-process geocoding cache bounds (LRU-K eviction)
+    geocode_cache_maxsize: int = 10000
+    geocode_cache_k: int = 2
     
     # Emergent LLM Key
-    emergent_llm_key: Optional[str] = os.getenv("EMERGENT_LLM_KEY")
+    emergent_llm_key: Optional[str] = None
     
     # Application Settings
-    environment: str = os.getenv("ENVIRONMENT", "development")
-    debug: bool = os.getenv("DEBUG", "true").lower() == "true"
+    environment: str = "development"
+    debug: bool = True
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="ignore")
 
 @lru_cache()
 def get_settings():
     return Settings()
 
-# Database connection
+# Database connection (one pooled client shared by every request)
 def get_database():
-    from motor.motor_asyncio import AsyncIOMotorClient
     settings = get_settings()
-    client = AsyncIOMotorClient(settings.mongo_url)
-    return client[settings.db_name]
+    return get_client(settings.mongo_url)[settings.db_name]
 
 # Utility functions
+@lru_cache(maxsize=1)
 def get_cors_origins():
     settings = get_settings()
     if settings.cors_origins == "*":
-        return ["*"]
-    return [origin.strip() for origin in settings.cors_origins.split(",")]
\ No newline at end of file
+        return ("*",)
+    return tuple(origin.strip() for origin in settings.cors_origins.split(","))
+
+# Hot settings resolved once; the environment does not change during the process lifetime
+JWT_SECRET_KEY = get_settings().jwt_secret_key
+JWT_ALGORITHM = get_settings().jwt_algorithm
+JWT_EXPIRATION_HOURS = get_settings().jwt_expiration_hours
+PASSWORD_HASH_WORKERS = max(1, get_settings().password_hash_workers)
+
+# Page size for admin list endpoints (users, submissions, inquiries)
+ADMIN_LIST_LIMIT = 500
+ADMIN_LIST_MAX_LIMIT = 2000
@@ -0,0 +1,51 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# Database configuration
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+
+_client: Optional[AsyncIOMotorClient] = None
+
+def get_client(mongo_url: Optional[str] = None) -> AsyncIOMotorClient:
+    """Return the process-wide Motor client, creating it with pooling and wire compression on first use"""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            mongo_url or MONGO_URL,
+            maxPoolSize=50,
+            minPoolSize=5,
+            compressors="zstd,zlib,snappy",
+            zlibCompressionLevel=6,
+            retryWrites=True,
+            uuidRepresentation="standard"
+        )
+    return _client
+
+def close_client() -> None:
+    """Close the shared client so the next get_client() call builds a fresh one"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+@asynccontextmanager
+async def connect(mongo_url: Optional[str] = None) -> AsyncIterator[AsyncIOMotorClient]:
+    """Yield the shared client and close it on exit, letting the loop drain pending driver tasks"""
+    client = get_client(mongo_url)
+    try:
+        yield client
+    finally:
+        close_client()
+        await asyncio.sleep(0)
+
+def run(main: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a script's async entry point, on uvloop when it is installed (shipped with uvicorn[standard])"""
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    return asyncio.run(main())
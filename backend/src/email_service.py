@@ -1,188 +1,39 @@
-try:
-    from sendgrid import SendGridAPIClient
-    from sendgrid.helpers.mail import Mail
-    SENDGRID_AVAILABLE = True
-except ImportError:
-    SENDGRID_AVAILABLE = False
-    SendGridAPIClient = None
-    Mail = None
-
-from typing import Optional, Dict, Any
+import asyncio
+from functools import lru_cache
+import httpx
+from fastapi import BackgroundTasks
+from typing import Optional, Dict, Any, List
 from config import get_settings
 from models import ContactSubmission, EmailNotification
 import logging
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
-class EmailDeliveryError(Exception):
-    """Custom exception for email delivery failures"""
-    pass
+SENDGRID_API_URL = "https://api.sendgrid.com"
 
-class EmailService:
-    def __init__(self):
-        if not SENDGRID_AVAILABLE:
-            logger.warning("SendGrid module not available. Email functionality will be disabled.")
-            self.client = None
-        elif not settings.sendgrid_api_key:
-            logger.warning("SendGrid API key not configured. Email functionality will be disabled.")
-            self.client = None
-        else:
-            self.client = SendGridAPIClient(settings.sendgrid_api_key)
-    
-    def _is_configured(self) -> bool:
-        """Check if email service is properly configured"""
-        return self.client is not None and settings.sender_email is not None
-    
-    async def send_email(
-        self, 
-        to_email: str, 
-        subject: str, 
-        content: str, 
-        content_type: str = "html"
-    ) -> bool:
-        """
-        Send email via SendGrid
-        
-        Args:
-            to_email: Recipient email address
-            subject: Email subject line
-            content: Email content (HTML or plain text)
-            content_type: "html" or "plain"
-        
-        Returns:
-            bool: True if email was sent successfully
-        """
-        if not self._is_configured():
-            logger.error("Email service not configured. Cannot send email.")
-            raise EmailDeliveryError("Email service not configured")
-        
-        try:
-            message = Mail(
-                from_email=settings.sender_email,
-                to_emails=to_email,
-                subject=subject,
-                html_content=content if content_type == "html" else None,
-                plain_text_content=content if content_type == "plain" else None
-            )
-            
-            response = self.client.send(message)
-            
-            if response.status_code == 202:
-                logger.info(f"Email sent successfully to {to_email}")
-                return True
-            else:
-                logger.error(f"Failed to send email. Status code: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}")
-            raise EmailDeliveryError(f"Failed to send email: {str(e)}")
-    
-    async def send_contact_form_notification(self, contact_data: ContactSubmission) -> bool:
-        """Send notification email for contact form submission"""
-        if not self._is_configured():
-            logger.info("Email service not configured. Contact form submission logged but no email sent.")
-            # Log the contact form data for development purposes
-            logger.info(f"Contact form submission: Name={contact_data.name}, Email={contact_data.email}, Message={contact_data.message[:100]}...")
-            return True  # Return True to indicate the submission was processed successfully
-        
-        try:
-            # Email to admin/support team
-            admin_subject = f"New Contact Form Submission from {contact_data.name}"
-            admin_content = self._generate_contact_admin_email(contact_data)
-            
-            # Send to admin (using sender email as recipient for now - should be configurable)
-            admin_success = await self.send_email(
-                to_email=settings.sender_email,
-                subject=admin_subject,
-                content=admin_content,
-                content_type="html"
-            )
-            
-            # Confirmation email to user
-            user_subject = "Thank you for contacting ROR STAY"
-            user_content = self._generate_contact_confirmation_email(contact_data)
-            
-            user_success = await self.send_email(
-                to_email=contact_data.email,
-                subject=user_subject,
-                content=user_content,
-                content_type="html"
-            )
-            
-            return admin_success and user_success
-            
-        except Exception as e:
-            logger.error(f"Failed to send contact form notification: {e}")
-            return False
-    
-    async def send_property_inquiry_notification(
-        self, 
-        user_email: str, 
-        user_name: str, 
-        property_title: str, 
-        inquiry_message: str
-    ) -> bool:
-        """Send notification for property inquiry"""
-        if not self._is_configured():
-            logger.info("Email service not configured. Property inquiry logged but no email sent.")
-            # Log the inquiry data for development purposes
-            logger.info(f"Property inquiry: User={user_name} ({user_email}), Property={property_title}, Message={inquiry_message[:100]}...")
-            return True  # Return True to indicate the inquiry was processed successfully
-        
-        try:
-            # Email to admin/agent
-            admin_subject = f"New Property Inquiry: {property_title}"
-            admin_content = self._generate_inquiry_admin_email(
-                user_email, user_name, property_title, inquiry_message
-            )
-            
-            admin_success = await self.send_email(
-                to_email=settings.sender_email,
-                subject=admin_subject,
-                content=admin_content,
-                content_type="html"
-            )
-            
-            # Confirmation email to user
-            user_subject = f"Your inquiry about {property_title} - ROR STAY"
-            user_content = self._generate_inquiry_confirmation_email(property_title, inquiry_message)
-            
-            user_success = await self.send_email(
-                to_email=user_email,
-                subject=user_subject,
-                content=user_content,
-                content_type="html"
-            )
-            
-            return admin_success and user_success
-            
-        except Exception as e:
-            logger.error(f"Failed to send property inquiry notification: {e}")
-            return False
-    
-    def _generate_contact_admin_email(self, contact_data: ContactSubmission) -> str:
-        """Generate HTML email content for admin contact notification"""
-        property_info = ""
-        if contact_data.property_id:
-            property_info = f"""
+# Notification jobs are drained by a few long-lived workers instead of per-request tasks.
+# The queue lives in process memory only: jobs still queued when the process crashes or
+# restarts, or when the shutdown drain times out, are lost (and logged as undelivered).
+EMAIL_QUEUE_MAX_SIZE = 1000
+EMAIL_WORKER_COUNT = 4
+EMAIL_DRAIN_TIMEOUT_SECONDS = 10.0
+
+# HTML email templates, filled with str.format_map at send time
+_PROPERTY_ROW_TMPL = """
             <tr>
                 <td style="padding: 10px; border-bottom: 1px solid #eee;"><strong>Property ID:</strong></td>
-                <td style="padding: 10px; border-bottom: 1px solid #eee;">{contact_data.property_id}</td>
+                <td style="padding: 10px; border-bottom: 1px solid #eee;">{property_id}</td>
             </tr>
             """
-        
-        phone_info = ""
-        if contact_data.phone:
-            phone_info = f"""
+
+_PHONE_ROW_TMPL = """
             <tr>
                 <td style="padding: 10px; border-bottom: 1px solid #eee;"><strong>Phone:</strong></td>
-                <td style="padding: 10px; border-bottom: 1px solid #eee;">{contact_data.phone}</td>
+                <td style="padding: 10px; border-bottom: 1px solid #eee;">{phone}</td>
             </tr>
             """
-        
-        return f"""
+
+_CONTACT_ADMIN_TMPL = """
         <html>
             <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                 <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
@@ -193,20 +44,20 @@ class EmailService:
                     <table style="width: 100%; border-collapse: collapse; margin: 20px 0;">
                         <tr>
                             <td style="padding: 10px; border-bottom: 1px solid #eee;"><strong>Name:</strong></td>
-                            <td style="padding: 10px; border-bottom: 1px solid #eee;">{contact_data.name}</td>
+                            <td style="padding: 10px; border-bottom: 1px solid #eee;">{name}</td>
                         </tr>
                         <tr>
                             <td style="padding: 10px; border-bottom: 1px solid #eee;"><strong>Email:</strong></td>
-                            <td style="padding: 10px; border-bottom: 1px solid #eee;">{contact_data.email}</td>
+                            <td style="padding: 10px; border-bottom: 1px solid #eee;">{email}</td>
                         </tr>
-                        {phone_info}
-                        {property_info}
+                        {phone_block}
+                        {property_block}
                     </table>
                     
                     <div style="margin: 20px 0;">
                         <h3 style="color: #2c3e50;">Message:</h3>
                         <div style="background: #f8f9fa; padding: 15px; border-radius: 5px; border-left: 4px solid #3498db;">
-                            {contact_data.message}
+                            {message}
                         </div>
                     </div>
                     
@@ -219,10 +70,8 @@ class EmailService:
             </body>
         </html>
         """
-    
-    def _generate_contact_confirmation_email(self, contact_data: ContactSubmission) -> str:
-        """Generate HTML email content for user contact confirmation"""
-        return f"""
+
+_CONTACT_CONFIRMATION_TMPL = """
         <html>
             <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                 <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
@@ -233,13 +82,13 @@ class EmailService:
                     
                     <h2 style="color: #2c3e50;">Thank You for Contacting Us!</h2>
                     
-                    <p>Dear {contact_data.name},</p>
+                    <p>Dear {name},</p>
                     
                     <p>Thank you for reaching out to ROR STAY. We have received your message and our team will get back to you within 24 hours.</p>
                     
                     <div style="background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
                         <h3 style="color: #2c3e50; margin-top: 0;">Your Message:</h3>
-                        <p style="margin-bottom: 0;">{contact_data.message}</p>
+                        <p style="margin-bottom: 0;">{message}</p>
                     </div>
                     
                     <p>In the meantime, feel free to browse our latest property listings on our website.</p>
@@ -260,16 +109,8 @@ class EmailService:
             </body>
         </html>
         """
-    
-    def _generate_inquiry_admin_email(
-        self, 
-        user_email: str, 
-        user_name: str, 
-        property_title: str, 
-        inquiry_message: str
-    ) -> str:
-        """Generate HTML email content for admin property inquiry notification"""
-        return f"""
+
+_INQUIRY_ADMIN_TMPL = """
         <html>
             <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                 <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
@@ -308,10 +149,8 @@ class EmailService:
             </body>
         </html>
         """
-    
-    def _generate_inquiry_confirmation_email(self, property_title: str, inquiry_message: str) -> str:
-        """Generate HTML email content for user inquiry confirmation"""
-        return f"""
+
+_INQUIRY_CONFIRMATION_TMPL = """
         <html>
             <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                 <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
@@ -362,9 +201,316 @@ class EmailService:
         </html>
         """
 
-# Create a singleton instance
-email_service = EmailService()
+class EmailDeliveryError(Exception):
+    """Custom exception for email delivery failures"""
+    pass
+
+class EmailService:
+    def __init__(self):
+        self.settings = get_settings()
+        self.client = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._in_flight = 0
+        if not self.settings.sendgrid_api_key:
+            logger.warning("SendGrid API key not configured. Email functionality will be disabled.")
+            return
+        
+        # Pooled client to the SendGrid v3 API; keepalive connections are reused across sends
+        self.client = httpx.AsyncClient(
+            base_url=SENDGRID_API_URL,
+            headers={"Authorization": f"Bearer {self.settings.sendgrid_api_key}"},
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        )
+    
+    def start_workers(self) -> None:
+        """Start the notification queue workers; must be called inside the running loop"""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=EMAIL_QUEUE_MAX_SIZE)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(EMAIL_WORKER_COUNT)]
+    
+    async def _worker(self) -> None:
+        """Send queued notifications one job at a time over the shared HTTP pool"""
+        while True:
+            job, args = await self._queue.get()
+            self._in_flight += 1
+            try:
+                await job(*args)
+            except Exception as e:
+                logger.error(f"Queued email job {job.__name__} failed: {e}")
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+    
+    def _enqueue(self, background_tasks: BackgroundTasks, job, *args) -> None:
+        """Queue a notification job, falling back to a request background task"""
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait((job, args))
+                return
+            except asyncio.QueueFull:
+                logger.warning(
+                    f"Email queue full ({self._queue.qsize()} jobs waiting); sending {job.__name__} "
+                    f"as a request background task, which is lost if the worker exits first"
+                )
+        background_tasks.add_task(job, *args)
+    
+    async def aclose(self):
+        """Drain queued notifications, stop the workers and close pooled HTTP connections"""
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), EMAIL_DRAIN_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"Email drain timed out after {EMAIL_DRAIN_TIMEOUT_SECONDS}s; "
+                    f"{self._queue.qsize() + self._in_flight} notification jobs undelivered "
+                    f"({self._queue.qsize()} queued, {self._in_flight} in flight)"
+                )
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+            self._queue = None
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+    
+    def _is_configured(self) -> bool:
+        """Check if email service is properly configured"""
+        return self.client is not None and self.settings.sender_email is not None
+    
+    @staticmethod
+    def _all_sent(results) -> bool:
+        """Fold gathered send results into a single success flag"""
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to send email: {result}")
+                return False
+        return all(results)
+    
+    async def send_email(
+        self, 
+        to_email: str, 
+        subject: str, 
+        content: str, 
+        content_type: str = "html"
+    ) -> bool:
+        """
+        Send email via SendGrid
+        
+        Args:
+            to_email: Recipient email address
+            subject: Email subject line
+            content: Email content (HTML or plain text)
+            content_type: "html" or "plain"
+        
+        Returns:
+            bool: True if email was sent successfully
+        """
+        if not self._is_configured():
+            logger.error("Email service not configured. Cannot send email.")
+            raise EmailDeliveryError("Email service not configured")
+        
+        try:
+            payload = {
+                "personalizations": [{"to": [{"email": to_email}]}],
+                "from": {"email": self.settings.sender_email},
+                "subject": subject,
+                "content": [{
+                    "type": "text/html" if content_type == "html" else "text/plain",
+                    "value": content
+                }]
+            }
+            
+            response = await self.client.post("/v3/mail/send", json=payload)
+            
+            if response.status_code == 202:
+                logger.info(f"Email sent successfully to {to_email}")
+                return True
+            else:
+                logger.error(f"Failed to send email. Status code: {response.status_code}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"Failed to send email to {to_email}: {str(e)}")
+            raise EmailDeliveryError(f"Failed to send email: {str(e)}")
+    
+    def send_contact_form_notification(self, background_tasks: BackgroundTasks, contact_data: ContactSubmission) -> None:
+        """Queue contact form notification emails to be sent after the response"""
+        self._enqueue(background_tasks, self._send_contact_form_notification_impl, contact_data)
+    
+    async def _send_contact_form_notification_impl(self, contact_data: ContactSubmission) -> bool:
+        """Send notification email for contact form submission"""
+        if not self._is_configured():
+            logger.info("Email service not configured. Contact form submission logged but no email sent.")
+            # Log the contact form data for development purposes
+            logger.info(f"Contact form submission: Name={contact_data.name}, Email={contact_data.email}, Message={contact_data.message[:100]}...")
+            return True  # Return True to indicate the submission was processed successfully
+        
+        try:
+            # Email to admin/support team
+            admin_subject = f"New Contact Form Submission from {contact_data.name}"
+            admin_content = self._generate_contact_admin_email(
+                contact_data.name, contact_data.email, contact_data.phone,
+                contact_data.property_id, contact_data.message
+            )
+            
+            # Confirmation email to user
+            user_subject = "Thank you for contacting ROR STAY"
+            user_content = self._generate_contact_confirmation_email(contact_data.name, contact_data.message)
+            
+            # Send to admin (using sender email as recipient for now - should be configurable) and user concurrently
+            results = await asyncio.gather(
+                self.send_email(
+                    to_email=self.settings.sender_email,
+                    subject=admin_subject,
+                    content=admin_content,
+                    content_type="html"
+                ),
+                self.send_email(
+                    to_email=contact_data.email,
+                    subject=user_subject,
+                    content=user_content,
+                    content_type="html"
+                ),
+                return_exceptions=True
+            )
+            
+            return self._all_sent(results)
+            
+        except Exception as e:
+            logger.error(f"Failed to send contact form notification: {e}")
+            return False
+    
+    def send_property_inquiry_notification(
+        self, 
+        background_tasks: BackgroundTasks, 
+        user_email: str, 
+        user_name: str, 
+        property_title: str, 
+        inquiry_message: str
+    ) -> None:
+        """Queue property inquiry notification emails to be sent after the response"""
+        self._enqueue(
+            background_tasks,
+            self._send_property_inquiry_notification_impl,
+            user_email, user_name, property_title, inquiry_message
+        )
+    
+    async def _send_property_inquiry_notification_impl(
+        self, 
+        user_email: str, 
+        user_name: str, 
+        property_title: str, 
+        inquiry_message: str
+    ) -> bool:
+        """Send notification for property inquiry"""
+        if not self._is_configured():
+            logger.info("Email service not configured. Property inquiry logged but no email sent.")
+            # Log the inquiry data for development purposes
+            logger.info(f"Property inquiry: User={user_name} ({user_email}), Property={property_title}, Message={inquiry_message[:100]}...")
+            return True  # Return True to indicate the inquiry was processed successfully
+        
+        try:
+            # Email to admin/agent
+            admin_subject = f"New Property Inquiry: {property_title}"
+            admin_content = self._generate_inquiry_admin_email(
+                user_email, user_name, property_title, inquiry_message
+            )
+            
+            # Confirmation email to user
+            user_subject = f"Your inquiry about {property_title} - ROR STAY"
+            user_content = self._generate_inquiry_confirmation_email(property_title, inquiry_message)
+            
+            results = await asyncio.gather(
+                self.send_email(
+                    to_email=self.settings.sender_email,
+                    subject=admin_subject,
+                    content=admin_content,
+                    content_type="html"
+                ),
+                self.send_email(
+                    to_email=user_email,
+                    subject=user_subject,
+                    content=user_content,
+                    content_type="html"
+                ),
+                return_exceptions=True
+            )
+            
+            return self._all_sent(results)
+            
+        except Exception as e:
+            logger.error(f"Failed to send property inquiry notification: {e}")
+            return False
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _generate_contact_admin_email(
+        name: str, 
+        email: str, 
+        phone: Optional[str], 
+        property_id: Optional[str], 
+        message: str
+    ) -> str:
+        """Generate HTML email content for admin contact notification"""
+        property_block = _PROPERTY_ROW_TMPL.format(property_id=property_id) if property_id else ""
+        phone_block = _PHONE_ROW_TMPL.format(phone=phone) if phone else ""
+        
+        return _CONTACT_ADMIN_TMPL.format_map({
+            "name": name,
+            "email": email,
+            "phone_block": phone_block,
+            "property_block": property_block,
+            "message": message
+        })
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _generate_contact_confirmation_email(name: str, message: str) -> str:
+        """Generate HTML email content for user contact confirmation"""
+        return _CONTACT_CONFIRMATION_TMPL.format_map({
+            "name": name,
+            "message": message
+        })
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _generate_inquiry_admin_email(
+        user_email: str, 
+        user_name: str, 
+        property_title: str, 
+        inquiry_message: str
+    ) -> str:
+        """Generate HTML email content for admin property inquiry notification"""
+        return _INQUIRY_ADMIN_TMPL.format_map({
+            "property_title": property_title,
+            "user_name": user_name,
+            "user_email": user_email,
+            "inquiry_message": inquiry_message
+        })
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _generate_inquiry_confirmation_email(property_title: str, inquiry_message: str) -> str:
+        """Generate HTML email content for user inquiry confirmation"""
+        return _INQUIRY_CONFIRMATION_TMPL.format_map({
+            "property_title": property_title,
+            "inquiry_message": inquiry_message
+        })
 
 # Dependency for FastAPI
+@lru_cache(maxsize=1)
 def get_email_service() -> EmailService:
-    return email_service
\ No newline at end of file
+    return EmailService()
+
+def start_email_workers() -> None:
+    """Start the notification queue workers for the app's lifetime"""
+    get_email_service().start_workers()
+
+async def close_email_service():
+    """Drain queued emails and release the email service's HTTP pool if it was ever created"""
+    if get_email_service.cache_info().currsize:
+        await get_email_service().aclose()
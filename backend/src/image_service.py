@@ -1,13 +1,34 @@
+import asyncio
 import os
 import uuid
 import shutil
-from typing import List, Optional
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, List, Optional
 from fastapi import UploadFile, HTTPException, status
 from PIL import Image
 import logging
 
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    PYVIPS_AVAILABLE = False
+    pyvips = None
+
 logger = logging.getLogger(__name__)
 
+# Leading file signatures of the accepted image formats
+_MAGIC = {
+    b'\xff\xd8\xff': '.jpg',
+    b'\x89PNG\r\n\x1a\n': '.png',
+    b'RIFF': '.webp',
+}
+_MAGIC_PREFIXES = tuple(_MAGIC)
+
+# Uploads are streamed in chunks and spill to disk past the spool size
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SPOOL_SIZE = 2 * 1024 * 1024
+
 class ImageService:
     def __init__(self):
         # Local storage directory for images
@@ -15,14 +36,15 @@ class ImageService:
         self.max_images = 10
         self.min_images = 1
         self.allowed_extensions = {'.jpg', '.jpeg', '.png', '.webp'}
+        self._allowed_ext_tuple = tuple(self.allowed_extensions)
         self.max_file_size = 10 * 1024 * 1024  # 10MB
         self.max_dimension = 2048  # Max width/height in pixels
         
         # Create upload directory if it doesn't exist
         os.makedirs(self.upload_dir, exist_ok=True)
         
-    def _validate_image_file(self, file: UploadFile) -> None:
-        """Validate uploaded image file"""
+    def _validate_image_file(self, file: UploadFile) -> str:
+        """Validate uploaded image file and return its lowercase extension"""
         # Check file extension
         if not file.filename:
             raise HTTPException(
@@ -43,11 +65,60 @@ class ImageService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File too large. Maximum size: {self.max_file_size // (1024*1024)}MB"
             )
+        
+        return file_ext
     
-    def _optimize_image(self, input_path: str, output_path: str) -> None:
+    def _validate_image_content(self, content: bytes, filename: str) -> None:
+        """Reject uploads whose header is not a supported image format"""
+        header = content[:12]
+        if not header.startswith(_MAGIC_PREFIXES) or (header.startswith(b'RIFF') and header[8:12] != b'WEBP'):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File content is not a valid image: {filename}"
+            )
+    
+    async def _spool_upload(self, file: UploadFile) -> SpooledTemporaryFile:
+        """Stream an upload into a spooled buffer, checking its header and size as chunks arrive"""
+        spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
+        try:
+            size = 0
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                if size == 0:
+                    self._validate_image_content(chunk, file.filename)
+                size += len(chunk)
+                if size > self.max_file_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File too large. Maximum size: {self.max_file_size // (1024*1024)}MB"
+                    )
+                spool.write(chunk)
+            
+            if size == 0:
+                self._validate_image_content(b"", file.filename)
+            
+            spool.seek(0)
+            return spool
+        except BaseException:
+            spool.close()
+            raise
+    
+    def _optimize_image(self, source: BinaryIO, output_path: str) -> None:
         """Optimize image for web display"""
+        if PYVIPS_AVAILABLE:
+            try:
+                # libvips shrinks in the JPEG DCT domain and streams tiles, never holding the full bitmap
+                img = pyvips.Image.thumbnail_buffer(source.read(), self.max_dimension, height=self.max_dimension, size="down")
+                img.jpegsave(output_path, Q=85, strip=True, optimize_coding=True, interlace=True)
+                return
+            except pyvips.Error as e:
+                logger.warning(f"libvips optimization failed, falling back to PIL: {e}")
+        
         try:
-            with Image.open(input_path) as img:
+            source.seek(0)
+            with Image.open(source) as img:
+                # Let libjpeg decode at a reduced scale straight from DCT coefficients (no-op for small or non-JPEG images)
+                img.draft('RGB', (self.max_dimension, self.max_dimension))
+                
                 # Convert to RGB if necessary
                 if img.mode in ('RGBA', 'P'):
                     img = img.convert('RGB')
@@ -61,8 +132,10 @@ class ImageService:
                 
         except Exception as e:
             logger.error(f"Error optimizing image: {e}")
-            # If optimization fails, just copy the original
-            shutil.copy2(input_path, output_path)
+            # If optimization fails, just store the original upload
+            source.seek(0)
+            with open(output_path, "wb") as buffer:
+                shutil.copyfileobj(source, buffer)
     
     async def upload_images(self, files: List[UploadFile], property_id: str) -> List[str]:
         """Upload multiple images for a property"""
@@ -78,56 +151,75 @@ class ImageService:
                 detail=f"Maximum {self.max_images} images allowed"
             )
         
-        uploaded_urls = []
-        property_dir = os.path.join(self.upload_dir, property_id)
-        os.makedirs(property_dir, exist_ok=True)
+        property_dir = f"{self.upload_dir}/{property_id}"
+        await asyncio.to_thread(os.makedirs, property_dir, exist_ok=True)
         
-        for i, file in enumerate(files):
+        # Validate everything up front so a bad file fails the request before any work is done
+        exts = [self._validate_image_file(file) for file in files]
+        
+        # Stream uploads into spools, then decode/resize/encode each image on a worker thread (PIL releases the GIL).
+        # Every worker runs to completion before the spools are closed, even when one of them fails.
+        spools = []
+        try:
+            for file in files:
+                spools.append(await self._spool_upload(file))
+            results = await asyncio.gather(*(
+                asyncio.to_thread(self._process_one, spool, file.filename, ext, property_dir, property_id)
+                for spool, file, ext in zip(spools, files, exts)
+            ), return_exceptions=True)
+        finally:
+            for spool in spools:
+                spool.close()
+        
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if failures:
+            # Don't leave part of a failed batch on disk
+            stored = [result for result in results if isinstance(result, str)]
+            await asyncio.to_thread(self._remove_uploaded, property_dir, stored)
+            raise failures[0]
+        
+        return results
+    
+    def _remove_uploaded(self, property_dir: str, image_urls: List[str]) -> None:
+        """Delete the files behind image URLs written during a failed upload"""
+        for image_url in image_urls:
+            file_path = os.path.join(property_dir, image_url.rsplit("/", 1)[-1])
             try:
-                # Validate file
-                self._validate_image_file(file)
-                
-                # Generate unique filename
-                file_ext = os.path.splitext(file.filename.lower())[1]
-                unique_filename = f"{uuid.uuid4()}{file_ext}"
-                temp_path = os.path.join(property_dir, f"temp_{unique_filename}")
-                final_path = os.path.join(property_dir, unique_filename)
-                
-                # Save uploaded file temporarily
-                with open(temp_path, "wb") as buffer:
-                    content = await file.read()
-                    buffer.write(content)
-                
-                # Optimize and save final image
-                self._optimize_image(temp_path, final_path)
-                
-                # Remove temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                
-                # Generate URL for the image
-                image_url = f"/api/images/{property_id}/{unique_filename}"
-                uploaded_urls.append(image_url)
-                
-                logger.info(f"Successfully uploaded image: {image_url}")
-                
-            except HTTPException:
-                raise
-            except Exception as e:
-                logger.error(f"Error uploading image {file.filename}: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to upload image: {file.filename}"
-                )
+                os.remove(file_path)
+            except OSError as e:
+                logger.warning(f"Could not remove uploaded image {file_path}: {e}")
+    
+    def _process_one(self, source: BinaryIO, filename: str, file_ext: str, property_dir: str, property_id: str) -> str:
+        """Store and optimize a single uploaded image, returning its URL"""
+        # Generate unique filename
+        unique_filename = f"{uuid.uuid4().hex}{file_ext}"
+        final_path = f"{property_dir}/{unique_filename}"
         
-        return uploaded_urls
+        try:
+            # Optimize straight from the spooled upload and save final image
+            self._optimize_image(source, final_path)
+            
+            # Generate URL for the image
+            image_url = f"/api/images/{property_id}/{unique_filename}"
+            logger.info(f"Successfully uploaded image: {image_url}")
+            return image_url
+            
+        except Exception as e:
+            logger.error(f"Error uploading image {filename}: {e}")
+            # Drop a partially written output
+            if os.path.exists(final_path):
+                os.remove(final_path)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload image: {filename}"
+            )
     
     async def delete_image(self, property_id: str, filename: str) -> bool:
         """Delete a specific image"""
         try:
             file_path = os.path.join(self.upload_dir, property_id, filename)
             if os.path.exists(file_path):
-                os.remove(file_path)
+                await asyncio.to_thread(os.remove, file_path)
                 logger.info(f"Deleted image: {file_path}")
                 return True
             return False
@@ -140,7 +232,7 @@ class ImageService:
         try:
             property_dir = os.path.join(self.upload_dir, property_id)
             if os.path.exists(property_dir):
-                shutil.rmtree(property_dir)
+                await asyncio.to_thread(shutil.rmtree, property_dir)
                 logger.info(f"Deleted all images for property: {property_id}")
                 return True
             return False
@@ -158,15 +250,16 @@ class ImageService:
     def list_property_images(self, property_id: str) -> List[str]:
         """List all images for a property"""
         property_dir = os.path.join(self.upload_dir, property_id)
-        if not os.path.exists(property_dir):
+        try:
+            # DirEntry caches file type from the directory read, so no extra stat per file
+            with os.scandir(property_dir) as entries:
+                return sorted(
+                    f"/api/images/{property_id}/{entry.name}"
+                    for entry in entries
+                    if entry.is_file() and entry.name.lower().endswith(self._allowed_ext_tuple)
+                )
+        except FileNotFoundError:
             return []
-        
-        images = []
-        for filename in os.listdir(property_dir):
-            if any(filename.lower().endswith(ext) for ext in self.allowed_extensions):
-                images.append(f"/api/images/{property_id}/{filename}")
-        
-        return sorted(images)
 
 # Global instance
 image_service = ImageService()
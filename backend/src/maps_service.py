@@ -1,54 +1,265 @@
 try:
-    import googlemaps
-    GOOGLEMAPS_AVAILABLE = True
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
 except ImportError:
-    GOOGLEMAPS_AVAILABLE = False
-    googlemaps = None
+    REDIS_AVAILABLE = False
+    aioredis = None
 
-from typing import Optional, List, Dict, Any
+import importlib.util
+
+# numba is imported lazily; importing it (and compiling) at module load slowed every script
+# that imports this module. The app compiles it off the loop at startup via warm_haversine()
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Optional, List, Dict, Any, AsyncIterator, Hashable, Sequence, Union
 from models import Coordinates, Address
 from config import get_settings
 from fastapi import HTTPException
+import heapq
+import httpx
 import logging
+import math
+import unicodedata
+import zlib
+from urllib.parse import urlencode
+import numpy as np
 from geopy.distance import geodesic
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Google Maps web service endpoint; one pooled HTTP/2 client is reused for every call
+GOOGLE_MAPS_API_URL = "https://maps.googleapis.com/maps/api"
+STATIC_MAP_URL = f"{GOOGLE_MAPS_API_URL}/staticmap"
+
+# Delay before a Nearby Search next_page_token becomes valid
+NEARBY_PAGE_TOKEN_DELAY_SECONDS = 2
+
+# Geocoding results are shared across workers through Redis
+GEOCODE_CACHE_TTL_SECONDS = 48 * 3600
+
+# Place Details fields actually read by get_place_details; Google returns and bills only these
+_PLACE_DETAILS_FIELDS = ",".join([
+    "name",
+    "place_id",
+    "formatted_address",
+    "formatted_phone_number",
+    "website",
+    "rating",
+    "user_ratings_total",
+    "types",
+    "opening_hours",
+    "geometry/location",
+])
+
+# Fetches the fields of a directions step in one C-level call
+_STEP_GET = itemgetter("html_instructions", "distance", "duration")
+
+# Reverse-geocode component type -> (address field, component name key, how to combine)
+_COMP_HANDLERS = {
+    "street_number": ("street", "long_name", "prefix"),
+    "route": ("street", "long_name", "append"),
+    "locality": ("city", "long_name", "set"),
+    "administrative_area_level_1": ("state", "short_name", "set"),
+    "postal_code": ("zip_code", "long_name", "set"),
+    "country": ("country", "long_name", "set"),
+}
+
+# Common street-type abbreviations folded together in geocoding cache keys
+_ADDRESS_ABBREVIATIONS = {
+    "st": "street",
+    "ave": "avenue",
+    "rd": "road",
+    "blvd": "boulevard",
+    "dr": "drive",
+    "ln": "lane",
+    "ct": "court",
+    "hwy": "highway",
+}
+
+def _normalize_address(address: str) -> str:
+    """Normalize an address for use as a cache key (case, whitespace, punctuation, abbreviations)"""
+    tokens = (token.strip(".,;") for token in unicodedata.normalize("NFKD", address).lower().split())
+    return " ".join(_ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens if token)
+
+# Mean Earth radius used by the haversine distance
+EARTH_RADIUS_MILES = 3958.7613
+
+def _haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in miles between two points given in degrees"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+_haversine_miles_jit = None
+
+def _haversine_miles_nb(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine via numba when installed, compiled (or loaded from numba's on-disk cache) on first call"""
+    global _haversine_miles_jit
+    if _haversine_miles_jit is None:
+        if NUMBA_AVAILABLE:
+            from numba import njit
+            _haversine_miles_jit = njit(cache=True, fastmath=True)(_haversine_miles)
+        else:
+            _haversine_miles_jit = _haversine_miles
+    return _haversine_miles_jit(lat1, lon1, lat2, lon2)
+
+def warm_haversine() -> None:
+    """Import numba and compile the haversine kernel ahead of the first request; blocks, so run it off the loop"""
+    _haversine_miles_nb(0.0, 0.0, 1.0, 1.0)
+
+@dataclass(slots=True, frozen=True)
+class CoordTuple:
+    """Slotted latitude/longitude pair for hot internal passes; Coordinates stays at the API boundary"""
+    lat: float
+    lng: float
+    
+    @classmethod
+    def from_model(cls, coordinates: Coordinates) -> "CoordTuple":
+        return cls(coordinates.latitude, coordinates.longitude)
+
+class LRUKCache:
+    """Size-bounded cache evicting the entry whose k-th most recent access is oldest (LRU-K)"""
+    
+    def __init__(self, maxsize: int, k: int = 2):
+        self.maxsize = maxsize
+        self.k = k
+        self._data: Dict[Hashable, Any] = {}
+        self._history: Dict[Hashable, deque] = {}
+        # Lazy heap of (k-th access tick, last access tick, key); stale entries are skipped on eviction
+        self._heap: List[tuple] = []
+        self._tick = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def _touch(self, key: Hashable) -> None:
+        self._tick += 1
+        history = self._history.get(key)
+        if history is None:
+            history = self._history[key] = deque(maxlen=self.k)
+        history.append(self._tick)
+        # Keys seen fewer than k times have an infinite backward k-distance and go first
+        kth = history[0] if len(history) == self.k else -1
+        heapq.heappush(self._heap, (kth, self._tick, key))
+        if len(self._heap) > 4 * self.maxsize:
+            self._compact()
+    
+    def _compact(self) -> None:
+        self._heap = [
+            (history[0] if len(history) == self.k else -1, history[-1], key)
+            for key, history in self._history.items()
+        ]
+        heapq.heapify(self._heap)
+    
+    def _evict(self) -> None:
+        while self._heap:
+            _, last, key = heapq.heappop(self._heap)
+            history = self._history.get(key)
+            if history is not None and history[-1] == last:
+                del self._data[key]
+                del self._history[key]
+                return
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        if key not in self._data:
+            return None
+        self._touch(key)
+        return self._data[key]
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        if key not in self._data and len(self._data) >= self.maxsize:
+            self._evict()
+        self._data[key] = value
+        self._touch(key)
+
 class GoogleMapsService:
     def __init__(self):
-        if not GOOGLEMAPS_AVAILABLE:
-            logger.warning("Google Maps module not available. Maps functionality will be limited.")
-            self.client = None
-        elif not settings.google_maps_api_key:
+        if not settings.google_maps_api_key:
             logger.warning("Google Maps API key not configured. Maps functionality will be limited.")
-            self.client = None
+            self.http = None
         else:
-            try:
-                self.client = googlemaps.Client(key=settings.google_maps_api_key)
-            except Exception as e:
-                logger.error(f"Failed to initialize Google Maps client: {e}")
-                self.client = None
+            self.http = httpx.AsyncClient(
+                base_url=GOOGLE_MAPS_API_URL,
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
+                timeout=10.0
+            )
         
-        self.geocoding_cache = {}
+        # Caps in-flight geocoding calls from batch lookups to respect Google QPS limits
+        self._geocode_semaphore = asyncio.Semaphore(settings.google_maps_concurrency)
+        
+        # Bounded in-process cache in front of the shared Redis cache
+        self.geocoding_cache = LRUKCache(settings.geocode_cache_maxsize, k=settings.geocode_cache_k)
+        
+        self.redis = None
+        if settings.redis_url and REDIS_AVAILABLE:
+            self.redis = aioredis.Redis.from_url(settings.redis_url)
+        elif settings.redis_url:
+            logger.warning("Redis module not available. Geocoding results will not be cached.")
+    
+    async def close(self):
+        """Close the HTTP and Redis connection pools"""
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+    
+    async def _cache_get(self, key: str) -> Optional[bytes]:
+        """Read a cached value, treating Redis failures as a miss"""
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"Redis get failed for {key}: {e}")
+            return None
+    
+    async def _cache_set(self, key: str, value: str) -> None:
+        """Store a value with the geocoding TTL, ignoring Redis failures"""
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(key, value, ex=GEOCODE_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Redis set failed for {key}: {e}")
     
     def _is_configured(self) -> bool:
         """Check if Google Maps service is properly configured"""
-        return self.client is not None
+        return self.http is not None
+    
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a Maps web service endpoint and return its JSON body, raising on API errors"""
+        response = await self.http.get(path, params={**params, "key": settings.google_maps_api_key})
+        response.raise_for_status()
+        data = response.json()
+        
+        api_status = data.get("status")
+        if api_status not in ("OK", "ZERO_RESULTS"):
+            raise RuntimeError(f"{api_status}: {data.get('error_message', 'Google Maps API error')}")
+        return data
     
     def _get_fallback_coordinates(self, address: str) -> Coordinates:
         """
         Generate fallback coordinates for development when Google Maps API is not available
         Uses a simple hash of the address to generate consistent coordinates
         """
-        import hashlib
-        
-        # Create a hash of the address for consistent coordinates
-        address_hash = hashlib.md5(address.lower().encode()).hexdigest()
+        # Create a hash of the address for consistent coordinates (non-cryptographic, runs in C)
+        address_hash = zlib.crc32(address.lower().encode())
         
-        # Convert hash to coordinates in a reasonable range (US area)
-        lat_offset = int(address_hash[:4], 16) % 1000 / 10000  # 0-0.1 range
-        lng_offset = int(address_hash[4:8], 16) % 1000 / 10000  # 0-0.1 range
+        # Convert hash halves to coordinates in a reasonable range (US area)
+        lat_offset = (address_hash >> 16) % 1000 / 10000  # 0-0.1 range
+        lng_offset = (address_hash & 0xFFFF) % 1000 / 10000  # 0-0.1 range
         
         # Base coordinates (New York City area) + small offset for variation
         latitude = 40.7128 + lat_offset
@@ -72,13 +283,21 @@ class GoogleMapsService:
             # Return fallback coordinates for development (New York City area)
             return self._get_fallback_coordinates(address)
         
-        # Check cache first
-        if address in self.geocoding_cache:
+        # Check cache first, keyed on the normalized address (Google still gets the original)
+        cache_key = "geo:" + _normalize_address(address)
+        coordinates = self.geocoding_cache.get(cache_key)
+        if coordinates is not None:
             logger.info(f"Using cached geocoding result for: {address}")
-            return self.geocoding_cache[address]
+            return coordinates
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached geocoding result for: {address}")
+            coordinates = Coordinates.model_validate_json(cached)
+            self.geocoding_cache.put(cache_key, coordinates)
+            return coordinates
         
         try:
-            geocode_result = self.client.geocode(address)
+            geocode_result = (await self._get("/geocode/json", {"address": address}))["results"]
             if geocode_result:
                 location = geocode_result[0]['geometry']['location']
                 coordinates = Coordinates(
@@ -87,7 +306,8 @@ class GoogleMapsService:
                 )
                 
                 # Cache the result
-                self.geocoding_cache[address] = coordinates
+                self.geocoding_cache.put(cache_key, coordinates)
+                await self._cache_set(cache_key, coordinates.model_dump_json())
                 logger.info(f"Successfully geocoded address: {address}")
                 return coordinates
             else:
@@ -98,6 +318,22 @@ class GoogleMapsService:
             logger.error(f"Geocoding failed for address '{address}': {e}")
             raise HTTPException(status_code=500, detail=f"Geocoding failed: {str(e)}")
     
+    async def geocode_addresses(self, addresses: List[str]) -> List[Optional[Coordinates]]:
+        """
+        Geocode many addresses concurrently, bounded by the configured concurrency
+        
+        Args:
+            addresses: Address strings to geocode
+            
+        Returns:
+            Coordinates (or None) for each address, in input order
+        """
+        async def geocode_one(address: str) -> Optional[Coordinates]:
+            async with self._geocode_semaphore:
+                return await self.geocode_address(address)
+        
+        return list(await asyncio.gather(*(geocode_one(address) for address in addresses)))
+    
     async def reverse_geocode(self, coordinates: Coordinates) -> Optional[Address]:
         """
         Convert coordinates to address using Google Reverse Geocoding API
@@ -112,10 +348,24 @@ class GoogleMapsService:
             logger.warning("Google Maps API not configured. Cannot reverse geocode coordinates.")
             return None
         
+        # Check cache first, keyed on coordinates rounded to ~100 m
+        cache_key = f"rgeo:{coordinates.latitude:.3f}:{coordinates.longitude:.3f}"
+        address = self.geocoding_cache.get(cache_key)
+        if address is not None:
+            logger.info(f"Using cached reverse geocoding result for: {coordinates.latitude}, {coordinates.longitude}")
+            return address
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached reverse geocoding result for: {coordinates.latitude}, {coordinates.longitude}")
+            address = Address.model_validate_json(cached)
+            self.geocoding_cache.put(cache_key, address)
+            return address
+        
         try:
-            reverse_geocode_result = self.client.reverse_geocode(
-                (coordinates.latitude, coordinates.longitude)
-            )
+            reverse_geocode_result = (await self._get(
+                "/geocode/json",
+                {"latlng": f"{coordinates.latitude},{coordinates.longitude}"}
+            ))["results"]
             
             if reverse_geocode_result:
                 result = reverse_geocode_result[0]
@@ -130,27 +380,35 @@ class GoogleMapsService:
                     'full_address': result['formatted_address']
                 }
                 
-                # Parse address components
+                # Parse address components, stopping once every handled type has been seen
+                # (street is complete only after both street_number and route)
+                filled = set()
                 for component in components:
-                    types = component['types']
-                    if 'street_number' in types:
-                        address_data['street'] = component['long_name'] + ' '
-                    elif 'route' in types:
-                        address_data['street'] += component['long_name']
-                    elif 'locality' in types:
-                        address_data['city'] = component['long_name']
-                    elif 'administrative_area_level_1' in types:
-                        address_data['state'] = component['short_name']
-                    elif 'postal_code' in types:
-                        address_data['zip_code'] = component['long_name']
-                    elif 'country' in types:
-                        address_data['country'] = component['long_name']
+                    for component_type in component['types']:
+                        handler = _COMP_HANDLERS.get(component_type)
+                        if handler:
+                            field, name_key, action = handler
+                            value = component[name_key]
+                            if action == "prefix":
+                                address_data[field] = value + ' ' + address_data[field]
+                            elif action == "append":
+                                address_data[field] += value
+                            else:
+                                address_data[field] = value
+                            filled.add(component_type)
+                            break
+                    if len(filled) == len(_COMP_HANDLERS):
+                        break
                 
                 # Clean up street address
                 address_data['street'] = address_data['street'].strip()
                 
+                address = Address(**address_data)
+                self.geocoding_cache.put(cache_key, address)
+                await self._cache_set(cache_key, address.model_dump_json())
+                
                 logger.info(f"Successfully reverse geocoded coordinates: {coordinates.latitude}, {coordinates.longitude}")
-                return Address(**address_data)
+                return address
             else:
                 logger.warning(f"No reverse geocoding results for coordinates: {coordinates.latitude}, {coordinates.longitude}")
                 return None
@@ -159,22 +417,34 @@ class GoogleMapsService:
             logger.error(f"Reverse geocoding failed for coordinates {coordinates.latitude}, {coordinates.longitude}: {e}")
             raise HTTPException(status_code=500, detail=f"Reverse geocoding failed: {str(e)}")
     
-    async def calculate_distance(self, origin: Coordinates, destination: Coordinates) -> float:
+    async def calculate_distance(
+        self, 
+        origin: Coordinates, 
+        destination: Coordinates, 
+        high_precision: bool = False
+    ) -> float:
         """
         Calculate distance between two coordinates in miles
         
         Args:
             origin: Starting coordinates
             destination: Ending coordinates
+            high_precision: Use the ellipsoidal geodesic instead of the spherical haversine
             
         Returns:
             Distance in miles
         """
         try:
-            distance = geodesic(
-                (origin.latitude, origin.longitude),
-                (destination.latitude, destination.longitude)
-            ).miles
+            if high_precision:
+                distance = geodesic(
+                    (origin.latitude, origin.longitude),
+                    (destination.latitude, destination.longitude)
+                ).miles
+            else:
+                distance = _haversine_miles_nb(
+                    float(origin.latitude), float(origin.longitude),
+                    float(destination.latitude), float(destination.longitude)
+                )
             
             logger.info(f"Calculated distance: {distance:.2f} miles")
             return distance
@@ -183,33 +453,56 @@ class GoogleMapsService:
             logger.error(f"Distance calculation failed: {e}")
             raise HTTPException(status_code=500, detail=f"Distance calculation failed: {str(e)}")
     
-    async def get_nearby_places(
+    async def calculate_distances_bulk(
+        self, 
+        origin: Coordinates, 
+        destinations: Sequence[Union[Coordinates, CoordTuple]]
+    ) -> np.ndarray:
+        """
+        Calculate haversine distances in miles from one origin to many destinations in a single vectorized pass
+        
+        Args:
+            origin: Starting coordinates
+            destinations: Destination coordinates
+            
+        Returns:
+            Array of distances in miles, in the same order as destinations
+        """
+        points = [d if isinstance(d, CoordTuple) else CoordTuple.from_model(d) for d in destinations]
+        count = len(points)
+        lats = np.radians(np.fromiter((p.lat for p in points), dtype=np.float64, count=count))
+        lons = np.radians(np.fromiter((p.lng for p in points), dtype=np.float64, count=count))
+        lat1 = math.radians(origin.latitude)
+        lon1 = math.radians(origin.longitude)
+        
+        a = np.sin((lats - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lats) * np.sin((lons - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+    
+    async def iter_nearby_places(
         self, 
         coordinates: Coordinates, 
         place_type: str = "school", 
         radius: int = 5000
-    ) -> List[Dict[str, Any]]:
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Get nearby places of interest using Google Places API
+        Stream nearby places page by page, following next_page_token (up to 60 results)
         
         Args:
             coordinates: Center coordinates for search
             place_type: Type of place to search for (school, hospital, restaurant, etc.)
             radius: Search radius in meters (max 50000)
             
-        Returns:
-            List of places with their details
+        Yields:
+            Place details, with distance from the search center
         """
-        if not self._is_configured():
-            logger.warning("Google Maps API not configured. Cannot search for nearby places.")
-            return []
+        params = {
+            "location": f"{coordinates.latitude},{coordinates.longitude}",
+            "radius": min(radius, 50000),  # Google API limit
+            "type": place_type
+        }
         
-        try:
-            places_result = self.client.places_nearby(
-                location=(coordinates.latitude, coordinates.longitude),
-                radius=min(radius, 50000),  # Google API limit
-                type=place_type
-            )
+        while True:
+            places_result = await self._get("/place/nearbysearch/json", params)
             
             places = []
             for place in places_result.get('results', []):
@@ -225,7 +518,59 @@ class GoogleMapsService:
                         'longitude': place['geometry']['location']['lng']
                     }
                 }
-                places.append(place_info)
+                # Leave out absent optional values instead of sending nulls
+                places.append({k: v for k, v in place_info.items() if v is not None})
+            
+            # Distance from the search center to every result on the page in one pass
+            if places:
+                distances = await self.calculate_distances_bulk(
+                    coordinates,
+                    [CoordTuple(place['coordinates']['latitude'], place['coordinates']['longitude']) for place in places]
+                )
+                for place, distance in zip(places, distances.tolist()):
+                    place['distance_miles'] = round(distance, 2)
+            
+            for place in places:
+                yield place
+            
+            next_page_token = places_result.get('next_page_token')
+            if not next_page_token:
+                return
+            
+            # Google only activates a page token after a short delay
+            await asyncio.sleep(NEARBY_PAGE_TOKEN_DELAY_SECONDS)
+            params = {"pagetoken": next_page_token}
+    
+    async def get_nearby_places(
+        self, 
+        coordinates: Coordinates, 
+        place_type: str = "school", 
+        radius: int = 5000,
+        max_results: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Get nearby places of interest using Google Places API
+        
+        Args:
+            coordinates: Center coordinates for search
+            place_type: Type of place to search for (school, hospital, restaurant, etc.)
+            radius: Search radius in meters (max 50000)
+            max_results: Stop fetching further pages once this many places are collected
+            
+        Returns:
+            List of places with their details
+        """
+        if not self._is_configured():
+            logger.warning("Google Maps API not configured. Cannot search for nearby places.")
+            return []
+        
+        try:
+            places = []
+            async with aclosing(self.iter_nearby_places(coordinates, place_type, radius)) as stream:
+                async for place in stream:
+                    places.append(place)
+                    if len(places) >= max_results:
+                        break
             
             logger.info(f"Found {len(places)} nearby {place_type}s")
             return places
@@ -249,7 +594,10 @@ class GoogleMapsService:
             return None
         
         try:
-            place_details = self.client.place(place_id=place_id)
+            place_details = await self._get("/place/details/json", {
+                "place_id": place_id,
+                "fields": _PLACE_DETAILS_FIELDS
+            })
             
             if place_details and 'result' in place_details:
                 result = place_details['result']
@@ -269,6 +617,8 @@ class GoogleMapsService:
                         'longitude': result['geometry']['location']['lng']
                     } if 'geometry' in result else None
                 }
+                # Leave out absent optional values instead of sending nulls
+                details = {k: v for k, v in details.items() if v is not None}
                 
                 logger.info(f"Retrieved details for place: {details['name']}")
                 return details
@@ -302,11 +652,11 @@ class GoogleMapsService:
             return None
         
         try:
-            directions_result = self.client.directions(
-                origin=(origin.latitude, origin.longitude),
-                destination=(destination.latitude, destination.longitude),
-                mode=mode
-            )
+            directions_result = (await self._get("/directions/json", {
+                "origin": f"{origin.latitude},{origin.longitude}",
+                "destination": f"{destination.latitude},{destination.longitude}",
+                "mode": mode
+            }))["routes"]
             
             if directions_result:
                 route = directions_result[0]  # First route
@@ -319,11 +669,11 @@ class GoogleMapsService:
                     'end_address': leg['end_address'],
                     'steps': [
                         {
-                            'instruction': step['html_instructions'],
-                            'distance': step['distance']['text'],
-                            'duration': step['duration']['text']
+                            'instruction': instruction,
+                            'distance': distance['text'],
+                            'duration': duration['text']
                         }
-                        for step in leg['steps']
+                        for instruction, distance, duration in map(_STEP_GET, leg['steps'])
                     ]
                 }
                 
@@ -361,7 +711,6 @@ class GoogleMapsService:
             return None
         
         try:
-            base_url = "https://maps.googleapis.com/maps/api/staticmap"
             params = {
                 "center": f"{center.latitude},{center.longitude}",
                 "zoom": zoom,
@@ -371,16 +720,15 @@ class GoogleMapsService:
                 "format": "png"
             }
             
-            # Add markers if provided
+            # Add markers if provided, one markers parameter per labelled pin
             if markers:
-                marker_strings = []
-                for i, marker in enumerate(markers):
-                    marker_strings.append(f"color:red|label:{i+1}|{marker.latitude},{marker.longitude}")
-                params["markers"] = "|".join(marker_strings)
+                params["markers"] = [
+                    f"color:red|label:{i+1}|{marker.latitude},{marker.longitude}"
+                    for i, marker in enumerate(markers)
+                ]
             
-            # Build URL
-            param_string = "&".join([f"{k}={v}" for k, v in params.items()])
-            url = f"{base_url}?{param_string}"
+            # Build URL with proper escaping
+            url = f"{STATIC_MAP_URL}?{urlencode(params, doseq=True, safe='|,:')}"
             
             logger.info("Generated static map URL")
             return url
@@ -389,9 +737,19 @@ class GoogleMapsService:
             logger.error(f"Static map URL generation failed: {e}")
             return None
 
-# Create a singleton instance
-maps_service = GoogleMapsService()
+# Singleton instance, created on first use so its HTTP pool binds to the running event loop
+maps_service: Optional[GoogleMapsService] = None
 
 # Dependency for FastAPI
 def get_maps_service() -> GoogleMapsService:
-    return maps_service
\ No newline at end of file
+    global maps_service
+    if maps_service is None:
+        maps_service = GoogleMapsService()
+    return maps_service
+
+async def close_maps_service():
+    """Release the maps service's HTTP and Redis pools if it was ever created"""
+    global maps_service
+    if maps_service is not None:
+        await maps_service.close()
+        maps_service = None
\ No newline at end of file
@@ -1,9 +1,13 @@
-from pydantic import BaseModel, Field, validator, EmailStr
+from pydantic import BaseModel, Field, field_validator, model_validator, EmailStr
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
+import re
 import uuid
 
+# Strips everything but digits from phone numbers
+_NON_DIGITS = re.compile(r"\D")
+
 # Enums
 class PropertyType(str, Enum):
     HOUSE = "house"
@@ -33,11 +37,8 @@ class Coordinates(BaseModel):
     latitude: float = Field(..., ge=-90, le=90, description="Latitude coordinate")
     longitude: float = Field(..., ge=-180, le=180, description="Longitude coordinate")
     
-    @validator('latitude', 'longitude')
-    def validate_coordinates(cls, v):
-        if not isinstance(v, (int, float)):
-            raise ValueError('Coordinates must be numeric')
-        return float(v)
+    class Config:
+        frozen = True
 
 class Address(BaseModel):
     street: str
@@ -47,10 +48,14 @@ class Address(BaseModel):
     country: str = "United States"
     full_address: Optional[str] = None
     
-    def __init__(self, **data):
-        super().__init__(**data)
+    class Config:
+        frozen = True
+    
+    @model_validator(mode="after")
+    def _set_full_address(self) -> "Address":
         if not self.full_address:
-            self.full_address = f"{self.street}, {self.city}, {self.state} {self.zip_code}"
+            object.__setattr__(self, "full_address", f"{self.street}, {self.city}, {self.state} {self.zip_code}")
+        return self
 
 # User Models
 class UserBase(BaseModel):
@@ -135,15 +140,11 @@ class MapBounds(BaseModel):
     northeast: Coordinates
     southwest: Coordinates
     
-    @validator('northeast', 'southwest')
-    def validate_bounds(cls, v, values):
-        if 'northeast' in values and 'southwest' in values:
-            ne = values.get('northeast', v)
-            sw = values.get('southwest', v)
-            if isinstance(ne, Coordinates) and isinstance(sw, Coordinates):
-                if ne.latitude <= sw.latitude or ne.longitude <= sw.longitude:
-                    raise ValueError('Northeast coordinate must be greater than southwest')
-        return v
+    @model_validator(mode="after")
+    def validate_bounds(self) -> "MapBounds":
+        if self.northeast.latitude < self.southwest.latitude:
+            raise ValueError('Northeast coordinate must be greater than southwest')
+        return self
 
 class PropertySearchFilters(BaseModel):
     bounds: Optional[MapBounds] = None
@@ -160,13 +161,15 @@ class PropertySearchFilters(BaseModel):
     state: Optional[str] = None
     features: Optional[List[str]] = None
     status: List[PropertyStatus] = [PropertyStatus.AVAILABLE]
+    # Pagination
+    page: int = Field(1, ge=1)
+    page_size: int = Field(1000, ge=1, le=1000)
     
-    @validator('max_price')
-    def validate_price_range(cls, v, values):
-        if v is not None and 'min_price' in values and values['min_price'] is not None:
-            if v < values['min_price']:
-                raise ValueError('Max price must be greater than min price')
-        return v
+    @model_validator(mode="after")
+    def validate_price_range(self) -> "PropertySearchFilters":
+        if self.max_price is not None and self.min_price is not None and self.max_price < self.min_price:
+            raise ValueError('Max price must be greater than min price')
+        return self
 
 # Contact and Inquiry Models
 class ContactSubmission(BaseModel):
@@ -180,11 +183,12 @@ class ContactSubmission(BaseModel):
     # Honeypot field (should remain empty for legitimate users)
     website: Optional[str] = None
 
-    @validator('phone')
+    @field_validator('phone', mode="before")
+    @classmethod
     def validate_phone(cls, v):
         if v is None:
             raise ValueError('Phone is required')
-        digits = ''.join(ch for ch in str(v) if ch.isdigit())
+        digits = _NON_DIGITS.sub("", str(v))
         if len(digits) != 10:
             raise ValueError('Phone must be exactly 10 digits')
         return digits
@@ -259,4 +263,8 @@ def generate_id() -> str:
 
 def get_current_timestamp() -> datetime:
     """Get current UTC timestamp"""
-    return datetime.utcnow()
\ No newline at end of file
+    return datetime.now(timezone.utc)
+
+def geo_point(coordinates: Coordinates) -> Dict[str, Any]:
+    """GeoJSON Point for the 2dsphere-indexed location field (longitude first)"""
+    return {"type": "Point", "coordinates": [coordinates.longitude, coordinates.latitude]}
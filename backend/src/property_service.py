@@ -1,20 +1,258 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ReadPreference, ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+from bson import ObjectId
 from fastapi import HTTPException, status
 from models import (
     Property, PropertyCreate, PropertyUpdate, PropertySearchFilters, 
-    MapBounds, Coordinates, User, UserRole, generate_id, get_current_timestamp
+    Address, Coordinates, User, UserRole, PropertyStatus, generate_id, get_current_timestamp,
+    geo_point
 )
 from maps_service import GoogleMapsService
 import logging
 import math
+import re
+import time
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+METERS_PER_MILE = 1609.344
+
+# cos(latitude) for whole degrees 0..90, used to size the fallback bounding box
+_COS_LAT_LUT = np.cos(np.radians(np.arange(0, 91)))
+
+# Upper bound on documents returned by list queries
+MAX_LIST_RESULTS = 1000
+
+# Fields returned by list endpoints; leaves out the GeoJSON location
+PROPERTY_LIST_PROJECTION = {field: 1 for field in Property.model_fields}
+
+# Aggregation tail that resolves id server-side (custom id, else stringified _id)
+_LIST_SHAPE_STAGES = [
+    {"$addFields": {"id": {"$ifNull": ["$id", {"$toString": "$_id"}]}}},
+    {"$project": {**PROPERTY_LIST_PROJECTION, "_id": 0}},
+]
+
+# Documents missing any of these are skipped rather than constructed
+_REQUIRED_LIST_FIELDS = frozenset(
+    name for name, field in Property.model_fields.items() if field.is_required() and name != "id"
+)
+
+def _hydrate_property(property_doc: Dict[str, Any]) -> Optional[Property]:
+    """
+    Convert a raw property document without re-running validation, preferring
+    the custom id over Mongo's _id. Stored documents were validated on write.
+    """
+    if not _REQUIRED_LIST_FIELDS.issubset(property_doc):
+        logger.warning(f"Skipping incomplete property document {property_doc.get('id') or property_doc.get('_id')}")
+        return None
+    if property_doc.get("id"):
+        property_doc.pop("_id", None)
+    else:
+        property_doc["id"] = str(property_doc.pop("_id"))
+    address = property_doc["address"]
+    property_doc["address"] = (
+        Address.model_construct(**address) if address.get("full_address") else Address(**address)
+    )
+    property_doc["coordinates"] = Coordinates.model_construct(**property_doc["coordinates"])
+    return Property.model_construct(**property_doc)
+
+def _hydrate_complete_property(property_doc: Dict[str, Any]) -> Property:
+    """Hydrate a single property that must be returned, rejecting legacy documents missing required fields"""
+    property_obj = _hydrate_property(property_doc)
+    if property_obj is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Stored property is missing required fields"
+        )
+    return property_obj
+
+def _to_property_list(docs: List[Dict[str, Any]]) -> List[Property]:
+    """Hydrate a batch of property documents, dropping incomplete ones"""
+    return [prop for prop in map(_hydrate_property, docs) if prop is not None]
+
+def _id_filter(property_id: str) -> Dict[str, Any]:
+    """Match a property by its custom id, or by Mongo's _id when the value is an ObjectId"""
+    if ObjectId.is_valid(property_id):
+        return {"$or": [{"id": property_id}, {"_id": ObjectId(property_id)}]}
+    return {"id": property_id}
+
+def _range(low: Optional[float], high: Optional[float]) -> Dict[str, Any]:
+    """Build a $gte/$lte range, skipping unset (or zero) bounds"""
+    bounds = {}
+    if low:
+        bounds["$gte"] = low
+    if high:
+        bounds["$lte"] = high
+    return bounds
+
+def _build_query(filters: PropertySearchFilters) -> Dict[str, Any]:
+    """Translate search filters into a MongoDB query with a stable shape"""
+    query: Dict[str, Any] = {}
+    
+    # Map bounds
+    if filters.bounds:
+        query["coordinates.latitude"] = {
+            "$gte": filters.bounds.southwest.latitude,
+            "$lte": filters.bounds.northeast.latitude
+        }
+        query["coordinates.longitude"] = {
+            "$gte": filters.bounds.southwest.longitude,
+            "$lte": filters.bounds.northeast.longitude
+        }
+    
+    if filters.property_types:
+        query["property_type"] = {"$in": filters.property_types}
+    
+    for field, low, high in (
+        ("price", filters.min_price, filters.max_price),
+        ("bedrooms", filters.min_bedrooms, filters.max_bedrooms),
+        ("bathrooms", filters.min_bathrooms, filters.max_bathrooms),
+        ("square_feet", filters.min_square_feet, filters.max_square_feet),
+    ):
+        bounds = _range(low, high)
+        if bounds:
+            query[field] = bounds
+    
+    # Features (require all), case-insensitive exact match on the stored lowercase copies
+    if filters.features:
+        features = sorted({str(f).lower() for f in filters.features if f is not None})
+        if features:
+            query["features_lc"] = {"$all": features}
+    
+    if filters.status:
+        query["status"] = {"$in": filters.status}
+    
+    # Address filters, case-insensitive exact match
+    if filters.city:
+        query["address.city_lc"] = filters.city.lower()
+    if filters.state:
+        query["address.state_lc"] = filters.state.lower()
+    
+    return query
+
+# Indexes behind search_properties, agent listings and nearby searches;
+# equality fields lead, range fields (price) come last
+PROPERTY_INDEXES = [
+    IndexModel([("status", 1), ("property_type", 1), ("price", 1)]),
+    IndexModel([("status", 1), ("created_at", -1)]),
+    IndexModel([("agent_id", 1), ("created_at", -1)]),
+    IndexModel([("address.city_lc", 1), ("address.state_lc", 1)]),
+    IndexModel([("bedrooms", 1), ("bathrooms", 1)]),
+    IndexModel([("features_lc", 1)]),
+    IndexModel([("location", "2dsphere")]),
+]
+
+def add_search_fields(property_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Store lowercase city/state/features so searches match by equality instead of regex"""
+    address = property_doc.get("address")
+    if address:
+        address["city_lc"] = address["city"].lower()
+        address["state_lc"] = address["state"].lower()
+    if "features" in property_doc:
+        property_doc["features_lc"] = [f.lower() for f in property_doc["features"] or []]
+    return property_doc
+
+async def ensure_property_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Backfill GeoJSON locations and search fields, then create the indexes used by property searches"""
+    await db.properties.update_many(
+        {"location": {"$exists": False}, "coordinates.latitude": {"$type": "number"}},
+        [{"$set": {"location": {
+            "type": "Point",
+            "coordinates": ["$coordinates.longitude", "$coordinates.latitude"]
+        }}}]
+    )
+    await db.properties.update_many(
+        {"address.city_lc": {"$exists": False}},
+        [{"$set": {
+            "address.city_lc": {"$toLower": "$address.city"},
+            "address.state_lc": {"$toLower": "$address.state"},
+            "features_lc": {"$map": {
+                "input": {"$ifNull": ["$features", []]},
+                "as": "feature",
+                "in": {"$toLower": "$$feature"}
+            }}
+        }}]
+    )
+    await db.properties.create_indexes(PROPERTY_INDEXES)
+
+def _new_property_doc(
+    property_data: PropertyCreate,
+    coordinates: Coordinates,
+    agent_id: Optional[str],
+    current_time
+) -> Dict[str, Any]:
+    """Build the stored document for a new property, including its search fields"""
+    property_doc = {
+        "id": generate_id(),
+        "title": property_data.title,
+        "property_type": property_data.property_type,
+        "status": property_data.status,
+        "price": property_data.price,
+        "bedrooms": property_data.bedrooms,
+        "bathrooms": property_data.bathrooms,
+        "square_feet": property_data.square_feet,
+        "description": property_data.description,
+        "features": property_data.features,
+        "images": property_data.images or [],
+        "address": property_data.address.model_dump() if hasattr(property_data.address, 'model_dump') else property_data.address,
+        "coordinates": coordinates.model_dump() if hasattr(coordinates, 'model_dump') else coordinates,
+        "location": geo_point(coordinates),
+        # Contact information fields
+        "contact_phone": property_data.contact_phone,
+        "alternative_phone": property_data.alternative_phone,
+        "contact_email": property_data.contact_email,
+        "agent_id": agent_id,
+        "created_at": current_time,
+        "updated_at": current_time
+    }
+    return add_search_fields(property_doc)
+
+# Short-lived per-process cache of single-property lookups (detail pages, permission checks).
+# Each uvicorn worker keeps its own copy and only that worker's entry is invalidated on
+# writes, so other workers may serve a stale property for up to the TTL; keep it short.
+PROPERTY_CACHE_TTL_SECONDS = 5
+PROPERTY_CACHE_MAX_SIZE = 1024
+_property_cache: Dict[str, Tuple[float, Property]] = {}
+
+def _get_cached_property(property_id: str) -> Optional[Property]:
+    """
+    Return a copy of the cached property, or None when missing or expired.
+    
+    Entries are per process: after an update handled by another worker this
+    may return data up to PROPERTY_CACHE_TTL_SECONDS old.
+    """
+    entry = _property_cache.get(property_id)
+    if entry is None:
+        return None
+    expires_at, property_obj = entry
+    if expires_at <= time.monotonic():
+        _property_cache.pop(property_id, None)
+        return None
+    # Callers get their own copy so mutating a response never touches the cached entry
+    return property_obj.model_copy(deep=True)
+
+def _cache_property(property_id: str, property_obj: Property) -> None:
+    if len(_property_cache) >= PROPERTY_CACHE_MAX_SIZE:
+        # Evict the oldest entry (dicts keep insertion order)
+        _property_cache.pop(next(iter(_property_cache)), None)
+    _property_cache[property_id] = (time.monotonic() + PROPERTY_CACHE_TTL_SECONDS, property_obj.model_copy(deep=True))
+
+def invalidate_cached_property(*property_ids: str) -> None:
+    """Drop cached lookups for a property after it changes (by 'id' and/or '_id' string)"""
+    for property_id in property_ids:
+        _property_cache.pop(property_id, None)
+
 class PropertyService:
     def __init__(self, db: AsyncIOMotorDatabase, maps_service: GoogleMapsService):
         self.db = db
         self.maps_service = maps_service
+        # Bind the collection once; motor builds a new wrapper on every db.properties access
+        self.properties = db.properties
+        # Read-only paths may be served by secondaries; writes stay on self.properties
+        self._read_props = self.properties.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
     
     async def create_property(self, property_data: PropertyCreate, current_user: User) -> Property:
         """
@@ -54,32 +292,10 @@ class PropertyService:
                 agent_id = current_user.id
             
             # Create property document
-            current_time = get_current_timestamp()
-            property_doc = {
-                "id": generate_id(),
-                "title": property_data.title,
-                "property_type": property_data.property_type,
-                "status": property_data.status,
-                "price": property_data.price,
-                "bedrooms": property_data.bedrooms,
-                "bathrooms": property_data.bathrooms,
-                "square_feet": property_data.square_feet,
-                "description": property_data.description,
-                "features": property_data.features,
-                "images": property_data.images or [],
-                "address": property_data.address.dict() if hasattr(property_data.address, 'dict') else property_data.address,
-                "coordinates": coordinates.dict() if hasattr(coordinates, 'dict') else coordinates,
-                # Contact information fields
-                "contact_phone": property_data.contact_phone,
-                "alternative_phone": property_data.alternative_phone,
-                "contact_email": property_data.contact_email,
-                "agent_id": agent_id,
-                "created_at": current_time,
-                "updated_at": current_time
-            }
+            property_doc = _new_property_doc(property_data, coordinates, agent_id, get_current_timestamp())
             
             # Insert into database
-            result = await self.db.properties.insert_one(property_doc)
+            result = await self.properties.insert_one(property_doc)
             
             if result.inserted_id:
                 # Return the created property
@@ -99,6 +315,70 @@ class PropertyService:
                 detail="Failed to create property"
             )
     
+    async def create_properties_bulk(
+        self,
+        properties_data: List[PropertyCreate],
+        current_user: User
+    ) -> List[Property]:
+        """
+        Create many properties with one insert_many, geocoding missing coordinates concurrently
+        
+        Args:
+            properties_data: Properties to create
+            current_user: Current authenticated user
+            
+        Returns:
+            Created properties; entries that fail to geocode or insert are skipped
+        """
+        try:
+            # Check permissions - only admins and agents can create properties
+            if current_user.role not in [UserRole.ADMIN, UserRole.AGENT]:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Only admins and agents can create properties"
+                )
+            
+            # Geocode every address lacking coordinates in one bounded batch
+            geocoded = iter(await self.maps_service.geocode_addresses(
+                [p.address.full_address for p in properties_data if not p.coordinates]
+            ))
+            
+            current_time = get_current_timestamp()
+            property_docs = []
+            for property_data in properties_data:
+                coordinates = property_data.coordinates or next(geocoded)
+                if not coordinates:
+                    logger.warning(f"Skipping bulk property '{property_data.title}': unable to geocode address")
+                    continue
+                agent_id = current_user.id if current_user.role == UserRole.AGENT else property_data.agent_id
+                property_docs.append(_new_property_doc(property_data, coordinates, agent_id, current_time))
+            
+            if not property_docs:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Unable to geocode any of the provided addresses"
+                )
+            
+            # Unordered so one bad document does not abort the rest of the batch
+            try:
+                await self.properties.insert_many(property_docs, ordered=False)
+            except BulkWriteError as e:
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                logger.warning(f"Bulk property insert: {len(failed)} of {len(property_docs)} documents failed")
+                property_docs = [doc for i, doc in enumerate(property_docs) if i not in failed]
+            
+            logger.info(f"Bulk created {len(property_docs)} properties by user {current_user.id}")
+            return [Property(**doc) for doc in property_docs]
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error bulk creating properties: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create properties"
+            )
+    
     async def get_property_by_id(self, property_id: str) -> Optional[Property]:
         """
         Get property by ID
@@ -109,37 +389,20 @@ class PropertyService:
         Returns:
             Property object or None if not found
         """
+        cached = _get_cached_property(property_id)
+        if cached is not None:
+            return cached
+        
         try:
-            from bson import ObjectId
-            property_doc = None
+            # Match the 'id' field or, for ObjectId-looking values, '_id' in one query
+            property_doc = await self._read_props.find_one(_id_filter(property_id), PROPERTY_LIST_PROJECTION)
             
-            # First try to search by the 'id' field
-            property_doc = await self.db.properties.find_one({"id": property_id})
+            property_obj = _hydrate_property(property_doc) if property_doc else None
+            if property_obj is None:
+                return None
             
-            # If not found by id field and property_id looks like an ObjectId, try searching by _id
-            if not property_doc and ObjectId.is_valid(property_id):
-                try:
-                    obj_id = ObjectId(property_id)
-                    property_doc = await self.db.properties.find_one({"_id": obj_id})
-                except Exception as e:
-                    logger.error(f"ObjectId search error: {e}")
-            
-            if property_doc:
-                # Convert MongoDB document to Property model
-                # Always use the original id field if it exists, otherwise use _id
-                if "id" in property_doc and property_doc["id"]:
-                    # Keep the original id and remove _id
-                    property_doc.pop("_id", None)
-                else:
-                    # Use _id as id if no custom id exists
-                    property_doc["id"] = str(property_doc.pop("_id"))
-                
-                # Convert nested dictionaries back to models
-                if "coordinates" in property_doc and property_doc["coordinates"]:
-                    property_doc["coordinates"] = Coordinates(**property_doc["coordinates"])
-                
-                return Property(**property_doc)
-            return None
+            _cache_property(property_id, property_obj)
+            return property_obj
             
         except Exception as e:
             logger.error(f"Error fetching property by ID {property_id}: {e}")
@@ -163,96 +426,86 @@ class PropertyService:
             Updated property
         """
         try:
-            # Get existing property
-            existing_property = await self.get_property_by_id(property_id)
-            if not existing_property:
+            # Check permissions
+            if current_user.role not in [UserRole.ADMIN, UserRole.AGENT]:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Only admins and agents can update properties"
+                )
+            
+            # Read the current document from the primary to diff against
+            existing_doc = await self.properties.find_one(_id_filter(property_id), PROPERTY_LIST_PROJECTION)
+            if existing_doc is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Property not found"
                 )
-            
-            # Check permissions
-            if current_user.role == UserRole.AGENT and existing_property.agent_id != current_user.id:
+            if current_user.role == UserRole.AGENT and existing_doc.get("agent_id") != current_user.id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="You can only update your own properties"
                 )
-            elif current_user.role not in [UserRole.ADMIN, UserRole.AGENT]:
+            
+            # Keep only fields whose value actually changes; nested models are dumped in full
+            # so computed values such as address.full_address are included
+            update_fields = {}
+            for field in property_update.model_fields_set:
+                value = getattr(property_update, field)
+                if value is not None:
+                    update_fields[field] = value.model_dump() if hasattr(value, 'model_dump') else value
+            update_data = {}
+            for field, value in update_fields.items():
+                current = existing_doc.get(field)
+                if field == "address" and isinstance(current, dict):
+                    current = {key: current.get(key) for key in value}
+                if current != value:
+                    update_data[field] = value
+            
+            # Legacy documents missing required fields can't be returned; refuse before writing
+            if not _REQUIRED_LIST_FIELDS.issubset({**existing_doc, **update_data}):
                 raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Only admins and agents can update properties"
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Stored property is missing required fields"
                 )
             
-            # Prepare update data
-            update_data = {}
-            update_fields = property_update.dict(exclude_unset=True)
+            if not update_data:
+                # Nothing to write; answer from the document we already have
+                return _hydrate_complete_property(existing_doc)
             
-            for field, value in update_fields.items():
-                if value is not None:
-                    if field == "address":
-                        # Handle both dict and Pydantic model
-                        if hasattr(value, 'dict'):
-                            update_data["address"] = value.dict()
-                            # If address changed, re-geocode
-                            new_coordinates = await self.maps_service.geocode_address(value.full_address)
-                            if new_coordinates:
-                                update_data["coordinates"] = new_coordinates.dict()
-                        else:
-                            # value is already a dict
-                            update_data["address"] = value
-                    elif field == "coordinates":
-                        # Handle both dict and Pydantic model
-                        if hasattr(value, 'dict'):
-                            update_data["coordinates"] = value.dict()
-                        else:
-                            # value is already a dict
-                            update_data["coordinates"] = value
-                    else:
-                        update_data[field] = value
+            if "coordinates" in update_data:
+                update_data["location"] = geo_point(Coordinates(**update_data["coordinates"]))
+            elif "address" in update_data and "coordinates" not in update_fields:
+                # The address changed and no explicit coordinates were sent: re-geocode
+                new_coordinates = await self.maps_service.geocode_address(update_data["address"]["full_address"])
+                if new_coordinates:
+                    update_data["coordinates"] = new_coordinates.model_dump()
+                    update_data["location"] = geo_point(new_coordinates)
+            
+            add_search_fields(update_data)
             
             # Add updated timestamp
             update_data["updated_at"] = get_current_timestamp()
             
-            # Update in database
-            from bson import ObjectId
+            # Ownership stays in the filter so a concurrent reassignment cannot slip through
+            filter_q = _id_filter(property_id)
+            if current_user.role == UserRole.AGENT:
+                filter_q = {**filter_q, "agent_id": current_user.id}
             
-            # Try by id field first
-            result = await self.db.properties.update_one(
-                {"id": property_id},
-                {"$set": update_data}
+            property_doc = await self.properties.find_one_and_update(
+                filter_q,
+                {"$set": update_data},
+                projection=PROPERTY_LIST_PROJECTION,
+                return_document=ReturnDocument.AFTER
             )
             
-            # If not found by id field and looks like ObjectId, try by _id
-            if result.matched_count == 0 and ObjectId.is_valid(property_id):
-                try:
-                    result = await self.db.properties.update_one(
-                        {"_id": ObjectId(property_id)},
-                        {"$set": update_data}
-                    )
-                except Exception:
-                    pass
-            
-            if result.matched_count == 0:
+            if property_doc is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Property not found for update"
-                )
-            
-            if result.modified_count == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="No changes were made to the property"
-                )
-            
-            # Return updated property
-            updated_property = await self.get_property_by_id(property_id)
-            if not updated_property:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to retrieve updated property"
+                    detail="Property not found"
                 )
             
-            return updated_property
+            invalidate_cached_property(property_id, property_doc.get("id") or str(property_doc.get("_id")))
+            return _hydrate_complete_property(property_doc)
             
         except HTTPException:
             raise
@@ -275,45 +528,39 @@ class PropertyService:
             True if deleted successfully
         """
         try:
-            # Get existing property
-            existing_property = await self.get_property_by_id(property_id)
-            if not existing_property:
+            # Check permissions
+            if current_user.role not in [UserRole.ADMIN, UserRole.AGENT]:
                 raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Property not found"
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Only admins and agents can delete properties"
                 )
             
-            # Check permissions
-            if current_user.role == UserRole.AGENT and existing_property.agent_id != current_user.id:
+            # Authorize against the primary, not the property cache or a lagging secondary
+            existing_doc = await self.properties.find_one(_id_filter(property_id), {"id": 1, "agent_id": 1})
+            if existing_doc is None:
                 raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only delete your own properties"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Property not found"
                 )
-            elif current_user.role not in [UserRole.ADMIN, UserRole.AGENT]:
+            if current_user.role == UserRole.AGENT and existing_doc.get("agent_id") != current_user.id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Only admins and agents can delete properties"
+                    detail="You can only delete your own properties"
                 )
             
-            # Delete from database
-            from bson import ObjectId
-            
-            # Try by id field first
-            result = await self.db.properties.delete_one({"id": property_id})
-            
-            # If not found by id field and looks like ObjectId, try by _id
-            if result.deleted_count == 0 and ObjectId.is_valid(property_id):
-                try:
-                    result = await self.db.properties.delete_one({"_id": ObjectId(property_id)})
-                except Exception:
-                    pass
+            # Delete from database by 'id' or '_id'; ownership stays in the filter as in update_property
+            filter_q = _id_filter(property_id)
+            if current_user.role == UserRole.AGENT:
+                filter_q = {**filter_q, "agent_id": current_user.id}
+            result = await self.properties.delete_one(filter_q)
             
             if result.deleted_count == 0:
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to delete property"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Property not found"
                 )
             
+            invalidate_cached_property(property_id, existing_doc.get("id") or str(existing_doc.get("_id")))
             logger.info(f"Property {property_id} deleted by user {current_user.id}")
             return True
             
@@ -326,164 +573,55 @@ class PropertyService:
                 detail="Failed to delete property"
             )
     
-    async def search_properties(self, filters: PropertySearchFilters) -> List[Property]:
+    async def _find_page(self, query: Dict[str, Any], skip: int, limit: int) -> List[Property]:
+        """Fetch one newest-first page of properties matching a query, already shaped by the server"""
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"created_at": -1}},
+            {"$skip": skip},
+            {"$limit": limit},
+            *_LIST_SHAPE_STAGES,
+        ]
+        docs = await self._read_props.aggregate(pipeline).to_list(limit)
+        return _to_property_list(docs)
+    
+    async def search_properties(
+        self,
+        filters: PropertySearchFilters,
+        include_total: bool = False
+    ) -> Tuple[List[Property], Optional[int]]:
         """
-        Search properties based on filters
+        Search properties based on filters, one page at a time
         
         Args:
-            filters: Search filters
+            filters: Search filters, including page and page_size
+            include_total: Also count all matches (an extra query)
             
         Returns:
-            List of matching properties
+            Matching properties for the page, and the total match count if requested
         """
         try:
-            # Build MongoDB query
-            query = {}
-            
-            # Apply map bounds filter if provided
-            if filters.bounds:
-                query["coordinates.latitude"] = {
-                    "$gte": filters.bounds.southwest.latitude,
-                    "$lte": filters.bounds.northeast.latitude
-                }
-                query["coordinates.longitude"] = {
-                    "$gte": filters.bounds.southwest.longitude,
-                    "$lte": filters.bounds.northeast.longitude
-                }
-            
-            # Apply property type filter
-            if filters.property_types:
-                query["property_type"] = {"$in": filters.property_types}
-            
-            # Apply price filters
-            if filters.min_price or filters.max_price:
-                price_query = {}
-                if filters.min_price:
-                    price_query["$gte"] = filters.min_price
-                if filters.max_price:
-                    price_query["$lte"] = filters.max_price
-                query["price"] = price_query
-            
-            # Apply bedroom filters
-            if filters.min_bedrooms or filters.max_bedrooms:
-                bedroom_query = {}
-                if filters.min_bedrooms:
-                    bedroom_query["$gte"] = filters.min_bedrooms
-                if filters.max_bedrooms:
-                    bedroom_query["$lte"] = filters.max_bedrooms
-                query["bedrooms"] = bedroom_query
-            
-            # Apply bathroom filters
-            if filters.min_bathrooms or filters.max_bathrooms:
-                bathroom_query = {}
-                if filters.min_bathrooms:
-                    bathroom_query["$gte"] = filters.min_bathrooms
-                if filters.max_bathrooms:
-                    bathroom_query["$lte"] = filters.max_bathrooms
-                query["bathrooms"] = bathroom_query
-
-            # Apply features (require all), case-insensitive exact match
-            if getattr(filters, "features", None):
-                feat_vals = filters.features
-                if not isinstance(feat_vals, list):
-                    feat_vals = [feat_vals]
-                try:
-                    import re
-                    regex_list = [{"$regex": f"^{re.escape(str(v))}$", "$options": "i"} for v in feat_vals if v is not None]
-                    if regex_list:
-                        query["features"] = {"$all": regex_list}
-                except Exception:
-                    # Fallback to direct $all
-                    query["features"] = {"$all": [str(v) for v in feat_vals if v is not None]}
-
-            # Apply square feet filters
-            if filters.min_square_feet or filters.max_square_feet:
-                sqft_query = {}
-                if filters.min_square_feet:
-                    sqft_query["$gte"] = filters.min_square_feet
-                if filters.max_square_feet:
-                    sqft_query["$lte"] = filters.max_square_feet
-                query["square_feet"] = sqft_query
-
-            # Apply status filter
-            if filters.status:
-                query["status"] = {"$in": filters.status}
-
-            # Apply address filters (case-insensitive exact match)
-            if getattr(filters, "city", None):
-                try:
-                    import re
-                    city_pattern = f"^{re.escape(filters.city)}$"
-                    query["address.city"] = {"$regex": city_pattern, "$options": "i"}
-                except Exception:
-                    query["address.city"] = filters.city
-            if getattr(filters, "state", None):
-                try:
-                    import re
-                    state_pattern = f"^{re.escape(filters.state)}$"
-                    query["address.state"] = {"$regex": state_pattern, "$options": "i"}
-                except Exception:
-                    query["address.state"] = filters.state
-
-            cursor = self.db.properties.find(query).limit(1000)  # Reasonable limit
-            properties: List[Property] = []
+            query = _build_query(filters)
+            skip = (filters.page - 1) * filters.page_size
             
-            async for property_doc in cursor:
-                try:
-                    # Convert MongoDB document to Property model
-                    # Debug what we have
-                    original_id = property_doc.get("id")
-                    has_custom_id = "id" in property_doc and property_doc["id"]
-                    print(f"DEBUG SEARCH: has_custom_id={has_custom_id}, original_id={original_id}")
-                    
-                    # Always use the original id field if it exists, otherwise use _id
-                    if "id" in property_doc and property_doc["id"]:
-                        # Keep the original id and remove _id
-                        property_doc.pop("_id", None)
-                        print(f"DEBUG SEARCH: Keeping custom ID: {property_doc['id']}")
-                    else:
-                        # Use _id as id if no custom id exists
-                        property_doc["id"] = str(property_doc.pop("_id"))
-                        print(f"DEBUG SEARCH: Using ObjectId: {property_doc['id']}")
-                    
-                    if "coordinates" in property_doc and property_doc["coordinates"]:
-                        property_doc["coordinates"] = Coordinates(**property_doc["coordinates"])
-                    
-                    properties.append(Property(**property_doc))
-                except Exception as e:
-                    logger.warning(f"Error processing property document: {e}")
-                    continue
+            properties = await self._find_page(query, skip, filters.page_size)
 
             # If no results and features were used, retry with relaxed contains match
-            if not properties and getattr(filters, "features", None):
+            if not properties and "features_lc" in query:
                 try:
-                    import re
                     relaxed = query.copy()
-                    feats = filters.features if isinstance(filters.features, list) else [filters.features]
-                    regex_list = [{"$regex": re.escape(str(v)), "$options": "i"} for v in feats if v is not None]
-                    if regex_list:
-                        relaxed["features"] = {"$all": regex_list}
-                        properties = []
-                        async for property_doc in self.db.properties.find(relaxed).limit(1000):
-                            try:
-                                # Always use the original id field if it exists, otherwise use _id
-                                if "id" in property_doc and property_doc["id"]:
-                                    # Keep the original id and remove _id
-                                    property_doc.pop("_id", None)
-                                else:
-                                    # Use _id as id if no custom id exists
-                                    property_doc["id"] = str(property_doc.pop("_id"))
-                                if "coordinates" in property_doc and property_doc["coordinates"]:
-                                    property_doc["coordinates"] = Coordinates(**property_doc["coordinates"])
-                                properties.append(Property(**property_doc))
-                            except Exception as e:
-                                logger.warning(f"Error processing property document (relaxed): {e}")
-                                continue
+                    # $all takes regex values, not $regex operator documents
+                    relaxed["features_lc"] = {"$all": [re.compile(re.escape(f)) for f in query["features_lc"]["$all"]]}
+                    properties = await self._find_page(relaxed, skip, filters.page_size)
+                    if properties:
+                        query = relaxed
                 except Exception as e:
                     logger.warning(f"Relaxed features retry failed: {e}")
+            
+            total = await self._read_props.count_documents(query) if include_total else None
 
             logger.info(f"Found {len(properties)} properties matching filters")
-            return properties
+            return properties, total
             
         except Exception as e:
             logger.error(f"Error searching properties: {e}")
@@ -492,37 +630,25 @@ class PropertyService:
                 detail="Failed to search properties"
             )
     
-    async def get_properties_by_agent(self, agent_id: str) -> List[Property]:
+    async def get_properties_by_agent(
+        self,
+        agent_id: str,
+        skip: int = 0,
+        limit: int = MAX_LIST_RESULTS
+    ) -> List[Property]:
         """
-        Get all properties for a specific agent
+        Get a page of properties for a specific agent, newest first
         
         Args:
             agent_id: Agent's user ID
+            skip: Number of properties to skip
+            limit: Maximum number of properties to return
             
         Returns:
             List of agent's properties
         """
         try:
-            properties = []
-            cursor = self.db.properties.find({"agent_id": agent_id})
-            
-            async for property_doc in cursor:
-                try:
-                    # Convert MongoDB document to Property model
-                    # Always use the original id field if it exists, otherwise use _id
-                    if "id" in property_doc and property_doc["id"]:
-                        # Keep the original id and remove _id
-                        property_doc.pop("_id", None)
-                    else:
-                        # Use _id as id if no custom id exists
-                        property_doc["id"] = str(property_doc.pop("_id"))
-                    
-                    property_doc["coordinates"] = Coordinates(**property_doc["coordinates"])
-                    
-                    properties.append(Property(**property_doc))
-                except Exception as e:
-                    logger.warning(f"Error processing property document: {e}")
-                    continue
+            properties = await self._find_page({"agent_id": agent_id}, skip, limit)
             
             logger.info(f"Found {len(properties)} properties for agent {agent_id}")
             return properties
@@ -552,34 +678,23 @@ class PropertyService:
             List of nearby properties
         """
         try:
-            # Calculate approximate bounding box (rough conversion)
-            lat_delta = radius_miles / 69.0  # Approximate miles per degree latitude
-            lng_delta = radius_miles / (69.0 * abs(math.cos(math.radians(coordinates.latitude))))
-            
-            bounds = MapBounds(
-                southwest=Coordinates(
-                    latitude=coordinates.latitude - lat_delta,
-                    longitude=coordinates.longitude - lng_delta
-                ),
-                northeast=Coordinates(
-                    latitude=coordinates.latitude + lat_delta,
-                    longitude=coordinates.longitude + lng_delta
-                )
-            )
-            
-            # Use search with bounds
-            filters = PropertySearchFilters(bounds=bounds)
-            candidate_properties = await self.search_properties(filters)
-            
-            # Filter by exact radius using maps service
-            nearby_properties = []
-            for prop in candidate_properties:
-                distance = await self.maps_service.calculate_distance(coordinates, prop.coordinates)
-                if distance <= radius_miles:
-                    nearby_properties.append(prop)
-                
-                if len(nearby_properties) >= limit:
-                    break
+            # Distance filtering, ordering and limit all happen on the 2dsphere index
+            query = {
+                "status": PropertyStatus.AVAILABLE,
+                "location": {
+                    "$nearSphere": {
+                        "$geometry": geo_point(coordinates),
+                        "$maxDistance": radius_miles * METERS_PER_MILE
+                    }
+                }
+            }
+            try:
+                docs = await self._read_props.find(query, PROPERTY_LIST_PROJECTION).limit(limit).to_list(limit)
+                nearby_properties = _to_property_list(docs)
+            except OperationFailure as e:
+                # No 2dsphere index yet (e.g. ensure_property_indexes has not run)
+                logger.warning(f"$nearSphere unavailable, falling back to bounding box search: {e}")
+                nearby_properties = await self._get_nearby_properties_fallback(coordinates, radius_miles, limit)
             
             logger.info(f"Found {len(nearby_properties)} properties within {radius_miles} miles")
             return nearby_properties
@@ -591,6 +706,43 @@ class PropertyService:
                 detail="Failed to find nearby properties"
             )
 
+    async def _get_nearby_properties_fallback(
+        self,
+        coordinates: Coordinates,
+        radius_miles: float,
+        limit: int
+    ) -> List[Property]:
+        """Bounding-box candidate query plus an exact radius filter, ordered by distance"""
+        # Approximate bounding box: ~69 miles per degree of latitude
+        lat_delta = radius_miles / 69.0
+        # Round |lat| up to the next whole degree so the box only ever grows
+        cos_lat = _COS_LAT_LUT[math.ceil(abs(coordinates.latitude))]
+        lng_delta = radius_miles / max(69.0 * cos_lat, 1e-6)
+        query = {
+            "status": PropertyStatus.AVAILABLE,
+            "coordinates.latitude": {
+                "$gte": max(coordinates.latitude - lat_delta, -90.0),
+                "$lte": min(coordinates.latitude + lat_delta, 90.0)
+            },
+            "coordinates.longitude": {
+                "$gte": max(coordinates.longitude - lng_delta, -180.0),
+                "$lte": min(coordinates.longitude + lng_delta, 180.0)
+            }
+        }
+        docs = await self._read_props.find(query, PROPERTY_LIST_PROJECTION).limit(MAX_LIST_RESULTS).to_list(MAX_LIST_RESULTS)
+        candidates = _to_property_list(docs)
+        
+        if not candidates:
+            return []
+        
+        # One vectorized haversine pass over every candidate
+        distances = await self.maps_service.calculate_distances_bulk(
+            coordinates, [prop.coordinates for prop in candidates]
+        )
+        in_range = np.flatnonzero(distances <= radius_miles)
+        nearest = in_range[np.argsort(distances[in_range], kind="stable")][:limit]
+        return [candidates[i] for i in nearest]
+
 # Dependency function
 def get_property_service(
     db: AsyncIOMotorDatabase,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import timedelta
 from models import User, UserCreate, UserLogin, Token, APIResponse
@@ -6,12 +6,19 @@ from auth import (
     authenticate_user, create_user, create_access_token, 
     get_current_active_user, get_current_admin_user
 )
-from config import get_database, get_settings
+from config import get_database, JWT_EXPIRATION_HOURS, ADMIN_LIST_LIMIT, ADMIN_LIST_MAX_LIMIT
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["authentication"])
-settings = get_settings()
+
+# Documents missing any of these can't be returned as a User
+_REQUIRED_USER_FIELDS = frozenset(
+    name for name, field in User.model_fields.items() if field.is_required() and name != "id"
+)
+
+# Only the fields a User needs cross the wire; hashed_password never leaves Mongo
+_USER_PROJECTION = {field: 1 for field in User.model_fields}
 
 @router.post("/register", response_model=User)
 async def register_user(
@@ -47,7 +54,7 @@ async def login_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        access_token_expires = timedelta(hours=settings.jwt_expiration_hours)
+        access_token_expires = timedelta(hours=JWT_EXPIRATION_HOURS)
         access_token = create_access_token(
             data={"sub": user.email}, expires_delta=access_token_expires
         )
@@ -73,24 +80,23 @@ async def get_current_user_info(
 
 @router.get("/users", response_model=list[User])
 async def get_all_users(
+    limit: int = Query(ADMIN_LIST_LIMIT, ge=1, le=ADMIN_LIST_MAX_LIMIT),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """Get all users (admin only)"""
     try:
-        users = []
-        cursor = db.users.find({})
+        cursor = db.users.find({}, _USER_PROJECTION).limit(limit).batch_size(limit)
+        user_docs = await cursor.to_list(length=limit)
         
-        async for user_doc in cursor:
-            try:
-                # Convert MongoDB document to User model
-                user_doc["id"] = str(user_doc.pop("_id", user_doc.get("id")))
-                # Remove sensitive information
-                user_doc.pop("hashed_password", None)
-                users.append(User(**user_doc))
-            except Exception as e:
-                logger.warning(f"Error processing user document: {e}")
+        users = []
+        for user_doc in user_docs:
+            # Stored users were validated on write; skip only incomplete documents
+            if not _REQUIRED_USER_FIELDS.issubset(user_doc):
+                logger.warning(f"Skipping incomplete user document {user_doc.get('_id')}")
                 continue
+            user_doc["id"] = str(user_doc.pop("_id", user_doc.get("id")))
+            users.append(User.model_construct(**user_doc))
         
         logger.info(f"Admin {current_user.email} retrieved {len(users)} users")
         return users
@@ -1,36 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from typing import List, Optional
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import IndexModel
+from pydantic import ValidationError
 from models import (
     ContactSubmission, ContactSubmissionResponse, Inquiry, InquiryCreate, 
     User, APIResponse, generate_id, get_current_timestamp
 )
 from email_service import get_email_service, EmailService
 from auth import get_current_active_user, get_current_admin_user
-from config import get_database, get_settings
+from config import get_database, get_settings, ADMIN_LIST_LIMIT, ADMIN_LIST_MAX_LIMIT
+import asyncio
 import logging
+import orjson
+import re
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/contact", tags=["contact"])
 
-@router.post("/submit", response_model=ContactSubmissionResponse)
+# Fields exposed by the public dev submissions listing
+_PUBLIC_SUBMISSION_FIELDS = (
+    "id", "name", "email", "phone", "preferred_location", "map_pin",
+    "message", "status", "created_at", "updated_at",
+)
+_PUBLIC_SUBMISSION_PROJECTION = {field: 1 for field in _PUBLIC_SUBMISSION_FIELDS}
+
+# Search terms made only of phone characters are matched as a phone-number prefix;
+# $text only matches whole tokens, so partial numbers would never hit
+_PHONE_SEARCH = re.compile(r"[\d\s().+-]+")
+_NON_DIGITS = re.compile(r"\D")
+
+# Collation of the name/email indexes behind the prefix search that runs when $text finds
+# nothing. A "starts with" match covers the usual admin lookups ("joh", "jane@") without a
+# full scan; substrings in the middle of a name or address are not found
+_CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+
+# Allowed status values and their 400 messages, built once
+_SUBMISSION_STATUS_ORDER = ("new", "in_progress", "contacted", "resolved", "closed")
+_SUBMISSION_STATUSES = frozenset(_SUBMISSION_STATUS_ORDER)
+_SUBMISSION_STATUS_ERROR = f"Invalid status. Must be one of: {', '.join(_SUBMISSION_STATUS_ORDER)}"
+
+_INQUIRY_STATUS_ORDER = ("new", "contacted", "closed")
+_INQUIRY_STATUSES = frozenset(_INQUIRY_STATUS_ORDER)
+_INQUIRY_STATUS_ERROR = f"Invalid status. Must be one of: {', '.join(_INQUIRY_STATUS_ORDER)}"
+
+# Indexes behind the admin listings; each covers its filter prefix plus the created_at sort
+CONTACT_SUBMISSION_INDEXES = [
+    IndexModel([("id", 1)], unique=True),
+    IndexModel([("created_at", -1)]),
+    IndexModel([("status", 1), ("created_at", -1)]),
+    IndexModel([("phone", 1)]),
+    IndexModel([("name", "text"), ("email", "text"), ("phone", "text")]),
+    IndexModel([("name", 1)], collation=_CASE_INSENSITIVE),
+    IndexModel([("email", 1)], collation=_CASE_INSENSITIVE),
+]
+
+INQUIRY_INDEXES = [
+    IndexModel([("id", 1)], unique=True),
+    IndexModel([("created_at", -1)]),
+    IndexModel([("status", 1), ("created_at", -1)]),
+    IndexModel([("user_id", 1), ("created_at", -1)]),
+    IndexModel([("property_id", 1), ("status", 1), ("created_at", -1)]),
+]
+
+async def ensure_contact_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create the indexes used by the contact submission and inquiry listings"""
+    await db.contact_submissions.create_indexes(CONTACT_SUBMISSION_INDEXES)
+    await db.inquiries.create_indexes(INQUIRY_INDEXES)
+
+async def _find_page_with_total(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    skip: int,
+    limit: int,
+    collation: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Fetch one newest-first page and the total match count concurrently"""
+    # Not a $facet: that returns the whole page inside one BSON document, capped at 16 MB
+    cursor = (
+        collection.find(query, collation=collation)
+        .sort("created_at", -1).skip(skip).limit(limit).batch_size(limit)
+    )
+    docs, total = await asyncio.gather(cursor.to_list(limit), collection.count_documents(query, collation=collation))
+    return docs, total
+
+def _parse_range_bound(value: str, end: bool) -> datetime:
+    """Parse an ISO date filter; a bare YYYY-MM-DD end bound covers the entire day"""
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        return parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed
+
+def _parse_contact_submission(body: Any) -> ContactSubmission:
+    """Validate a raw contact form body, reporting errors the way a typed body parameter would"""
+    try:
+        return ContactSubmission.model_validate(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+@router.post(
+    "/submit",
+    response_model=ContactSubmissionResponse,
+    # The body is parsed by hand, so document it explicitly
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ContactSubmission.model_json_schema(
+            ref_template="#/components/schemas/{model}"
+        )}}
+    }}
+)
 async def submit_contact_form(
-    contact_data: ContactSubmission,
+    request: Request,
     background_tasks: BackgroundTasks,
     db: AsyncIOMotorDatabase = Depends(get_database),
     email_service: EmailService = Depends(get_email_service)
 ):
     """Submit contact form and send notification emails"""
     try:
-        # Server-side honeypot: if filled, silently accept without storing/emailing
-        if getattr(contact_data, "website", None):
-            logger.warning("Honeypot triggered on contact submit; dropping silently")
-            return ContactSubmissionResponse(
-                id=generate_id(),
-                status="received",
-                message="Thank you for your message. We'll get back to you soon!"
-            )
-
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body",), "msg": "JSON decode error", "input": {}}]
+        )
+    
+    # Server-side honeypot: checked on the raw body so bot traffic is dropped before any validation
+    if isinstance(body, dict) and body.get("website"):
+        logger.warning("Honeypot triggered on contact submit; dropping silently")
+        return ContactSubmissionResponse(
+            id=generate_id(),
+            status="received",
+            message="Thank you for your message. We'll get back to you soon!"
+        )
+    
+    contact_data = _parse_contact_submission(body)
+    
+    try:
         # Generate unique ID for the contact submission
         submission_id = generate_id()
         current_time = get_current_timestamp()
@@ -53,10 +161,7 @@ async def submit_contact_form(
         await db.contact_submissions.insert_one(contact_doc)
         
         # Send email notifications in background
-        background_tasks.add_task(
-            email_service.send_contact_form_notification,
-            contact_data
-        )
+        email_service.send_contact_form_notification(background_tasks, contact_data)
         
         logger.info(f"Contact form submitted: {submission_id} from {contact_data.email}")
         
@@ -75,50 +180,55 @@ async def submit_contact_form(
 
 @router.get("/submissions", response_model=List[dict])
 async def get_contact_submissions(
+    response: Response,
     status_filter: Optional[str] = None,
+    q: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(ADMIN_LIST_LIMIT, ge=1, le=ADMIN_LIST_MAX_LIMIT),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
-    """Get all contact submissions (admin only)"""
+    """Get all contact submissions (admin only); the match count is returned in X-Total-Count"""
     try:
         query = {}
         if status_filter:
             query["status"] = status_filter
         if q:
-            query["$or"] = [
-                {"name": {"$regex": q, "$options": "i"}},
-                {"email": {"$regex": q, "$options": "i"}},
-                {"phone": {"$regex": q, "$options": "i"}},
-            ]
+            phone_digits = _NON_DIGITS.sub("", q) if _PHONE_SEARCH.fullmatch(q) else ""
+            if phone_digits:
+                # Phones are stored as bare digits, so an anchored case-sensitive prefix walks the phone index
+                query["phone"] = {"$regex": f"^{phone_digits}"}
+            else:
+                # Served by the name/email/phone text index instead of a regex scan
+                query["$text"] = {"$search": q}
         # Date range filter on created_at
         if from_date or to_date:
             date_query = {}
             try:
-                from_dt = None
-                to_dt = None
                 if from_date:
-                    from_dt = __import__("datetime").datetime.fromisoformat(from_date)
+                    date_query["$gte"] = _parse_range_bound(from_date, end=False)
                 if to_date:
-                    # include entire day when only date provided
-                    to_dt = __import__("datetime").datetime.fromisoformat(to_date)
-                    if len(to_date) == 10:  # YYYY-MM-DD
-                        to_dt = to_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
-                if from_dt:
-                    date_query["$gte"] = from_dt
-                if to_dt:
-                    date_query["$lte"] = to_dt
-                if date_query:
-                    query["created_at"] = date_query
-            except Exception:
+                    date_query["$lte"] = _parse_range_bound(to_date, end=True)
+                query["created_at"] = date_query
+            except ValueError:
                 # If date parsing fails, ignore date filters to avoid 500s in dev endpoint
                 pass
         
-        submissions = []
-        cursor = db.contact_submissions.find(query).sort("created_at", -1)
+        submissions, total = await _find_page_with_total(db.contact_submissions, query, skip, limit)
+        if not total and "$text" in query:
+            # $text only matches whole words; retry as a case-insensitive name/email prefix
+            del query["$text"]
+            prefix = {"$regex": f"^{re.escape(q)}", "$options": "i"}
+            query["$or"] = [{"name": prefix}, {"email": prefix}]
+            submissions, total = await _find_page_with_total(
+                db.contact_submissions, query, skip, limit, collation=_CASE_INSENSITIVE
+            )
+        response.headers["X-Total-Count"] = str(total)
         
-        async for doc in cursor:
+        for doc in submissions:
             doc["id"] = str(doc.pop("_id", doc.get("id")))
-            submissions.append(doc)
         
         logger.info(f"Admin {current_user.email} retrieved {len(submissions)} contact submissions")
         return submissions
@@ -152,24 +262,16 @@ async def get_contact_submissions_public(
         if status_filter:
             query["status"] = status_filter
 
-        submissions = []
-        cursor = db.contact_submissions.find(query).sort("created_at", -1).limit(min(max(limit, 1), 200))
+        cursor = db.contact_submissions.find(query, _PUBLIC_SUBMISSION_PROJECTION).sort("created_at", -1)
+        docs = await cursor.limit(min(max(limit, 1), 200)).to_list(length=None)
 
-        async for doc in cursor:
+        submissions = []
+        for doc in docs:
+            # Every field is present (None when unset) so the response shape stays fixed
+            submission = {field: doc.get(field) for field in _PUBLIC_SUBMISSION_FIELDS}
             # Preserve the domain id if present; otherwise fallback to Mongo _id
-            domain_id = doc.get("id") or str(doc.get("_id"))
-            submissions.append({
-                "id": domain_id,
-                "name": doc.get("name"),
-                "email": doc.get("email"),
-                "phone": doc.get("phone"),
-                "preferred_location": doc.get("preferred_location"),
-                "map_pin": doc.get("map_pin"),
-                "message": doc.get("message"),
-                "status": doc.get("status"),
-                "created_at": doc.get("created_at"),
-                "updated_at": doc.get("updated_at"),
-            })
+            submission["id"] = submission["id"] or str(doc.get("_id"))
+            submissions.append(submission)
 
         return submissions
     except Exception as e:
@@ -191,11 +293,10 @@ async def update_submission_status_public(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Public status update endpoint disabled")
 
     try:
-        valid_statuses = ["new", "in_progress", "contacted", "resolved", "closed"]
-        if new_status not in valid_statuses:
+        if new_status not in _SUBMISSION_STATUSES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+                detail=_SUBMISSION_STATUS_ERROR
             )
 
         result = await db.contact_submissions.update_one(
@@ -203,7 +304,8 @@ async def update_submission_status_public(
             {"$set": {"status": new_status, "updated_at": get_current_timestamp()}}
         )
 
-        if result.modified_count == 0:
+        # matched_count so re-applying the current status is not reported as missing
+        if result.matched_count == 0:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact submission not found")
 
         return APIResponse(success=True, message=f"Status updated to {new_status}")
@@ -225,11 +327,10 @@ async def update_submission_status(
 ):
     """Update contact submission status (admin only)"""
     try:
-        valid_statuses = ["new", "in_progress", "contacted", "resolved", "closed"]
-        if new_status not in valid_statuses:
+        if new_status not in _SUBMISSION_STATUSES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+                detail=_SUBMISSION_STATUS_ERROR
             )
         
         result = await db.contact_submissions.update_one(
@@ -243,7 +344,7 @@ async def update_submission_status(
             }
         )
         
-        if result.modified_count == 0:
+        if result.matched_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Contact submission not found"
@@ -292,15 +393,16 @@ async def create_property_inquiry(
             "response": None
         }
         
-        await db.inquiries.insert_one(inquiry_doc)
-        
-        # Get property info for email notification
-        property_doc = await db.properties.find_one({"id": inquiry_data.property_id})
+        # Insert and fetch the property title for the email concurrently
+        _, property_doc = await asyncio.gather(
+            db.inquiries.insert_one(inquiry_doc),
+            db.properties.find_one({"id": inquiry_data.property_id}, {"title": 1, "_id": 0})
+        )
         property_title = property_doc.get("title", "Unknown Property") if property_doc else "Unknown Property"
         
         # Send email notifications in background
-        background_tasks.add_task(
-            email_service.send_property_inquiry_notification,
+        email_service.send_property_inquiry_notification(
+            background_tasks,
             current_user.email,
             f"{current_user.first_name} {current_user.last_name}",
             property_title,
@@ -322,12 +424,15 @@ async def create_property_inquiry(
 
 @router.get("/inquiries", response_model=List[Inquiry])
 async def get_all_inquiries(
+    response: Response,
     status_filter: Optional[str] = None,
     property_id: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(ADMIN_LIST_LIMIT, ge=1, le=ADMIN_LIST_MAX_LIMIT),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
-    """Get all property inquiries (admin only)"""
+    """Get all property inquiries (admin only); the match count is returned in X-Total-Count"""
     try:
         query = {}
         if status_filter:
@@ -335,12 +440,14 @@ async def get_all_inquiries(
         if property_id:
             query["property_id"] = property_id
         
-        inquiries = []
-        cursor = db.inquiries.find(query).sort("created_at", -1)
+        docs, total = await _find_page_with_total(db.inquiries, query, skip, limit)
+        response.headers["X-Total-Count"] = str(total)
         
-        async for doc in cursor:
+        # Stored inquiries were validated on write
+        inquiries = []
+        for doc in docs:
             doc["id"] = str(doc.pop("_id", doc.get("id")))
-            inquiries.append(Inquiry(**doc))
+            inquiries.append(Inquiry.model_construct(**doc))
         
         logger.info(f"Admin {current_user.email} retrieved {len(inquiries)} inquiries")
         return inquiries
@@ -359,12 +466,13 @@ async def get_my_inquiries(
 ):
     """Get current user's inquiries"""
     try:
-        inquiries = []
-        cursor = db.inquiries.find({"user_id": current_user.id}).sort("created_at", -1)
+        docs = await db.inquiries.find({"user_id": current_user.id}).sort("created_at", -1).to_list(length=None)
         
-        async for doc in cursor:
+        # Stored inquiries were validated on write
+        inquiries = []
+        for doc in docs:
             doc["id"] = str(doc.pop("_id", doc.get("id")))
-            inquiries.append(Inquiry(**doc))
+            inquiries.append(Inquiry.model_construct(**doc))
         
         return inquiries
         
@@ -385,11 +493,10 @@ async def update_inquiry_status(
 ):
     """Update inquiry status and add response (admin only)"""
     try:
-        valid_statuses = ["new", "contacted", "closed"]
-        if new_status not in valid_statuses:
+        if new_status not in _INQUIRY_STATUSES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+                detail=_INQUIRY_STATUS_ERROR
             )
         
         update_data = {
@@ -406,7 +513,7 @@ async def update_inquiry_status(
             {"$set": update_data}
         )
         
-        if result.modified_count == 0:
+        if result.matched_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Inquiry not found"
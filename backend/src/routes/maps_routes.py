@@ -103,12 +103,13 @@ async def get_nearby_places(
     longitude: float = Query(..., description="Center longitude"),
     place_type: str = Query("school", description="Type of place to search for"),
     radius: int = Query(5000, ge=100, le=50000, description="Search radius in meters"),
+    max_results: int = Query(20, ge=1, le=60, description="Maximum number of places to return"),
     maps_service: GoogleMapsService = Depends(get_maps_service)
 ):
     """Get nearby places of interest"""
     try:
         coordinates = Coordinates(latitude=latitude, longitude=longitude)
-        places = await maps_service.get_nearby_places(coordinates, place_type, radius)
+        places = await maps_service.get_nearby_places(coordinates, place_type, radius, max_results)
         
         return places
         
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from models import (
     Property, PropertyCreate, PropertyUpdate, PropertySearchFilters, 
-    MapBounds, Coordinates, User, APIResponse, generate_id, get_current_timestamp
+    MapBounds, Coordinates, User, APIResponse, generate_id, get_current_timestamp, geo_point
 )
-from property_service import PropertyService
+from property_service import PropertyService, add_search_fields, MAX_LIST_RESULTS
 from maps_service import get_maps_service, GoogleMapsService
 from auth import get_current_active_user, get_current_agent_or_admin_user
 from config import get_database, get_settings
@@ -41,6 +41,20 @@ async def create_property(
             detail="Failed to create property"
         )
 
+@router.post("/bulk", response_model=List[Property])
+async def create_properties_bulk(
+    properties_data: List[PropertyCreate],
+    current_user: User = Depends(get_current_agent_or_admin_user),
+    property_service: PropertyService = Depends(get_property_service_dep)
+):
+    """Create many properties in one request, e.g. for CSV imports (agents and admins only)"""
+    if not properties_data or len(properties_data) > MAX_LIST_RESULTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {MAX_LIST_RESULTS} properties"
+        )
+    return await property_service.create_properties_bulk(properties_data, current_user)
+
 # Development-only public creation endpoint (no auth)
 @router.post("/public", response_model=Property)
 async def create_property_public(
@@ -81,12 +95,14 @@ async def create_property_public(
             "images": property_data.images,
             "address": property_data.address.dict(),
             "coordinates": coordinates.dict(),
+            "location": geo_point(coordinates),
             "agent_id": property_data.agent_id,
             "created_at": current_time,
             "updated_at": current_time
         }
 
-        result = await property_service.db.properties.insert_one(property_doc)
+        add_search_fields(property_doc)
+        result = await property_service.properties.insert_one(property_doc)
         if not result.inserted_id:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create property")
 
@@ -99,13 +115,19 @@ async def create_property_public(
 
 @router.get("/", response_model=List[Property])
 async def get_all_properties(
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(MAX_LIST_RESULTS, ge=1, le=MAX_LIST_RESULTS, description="Properties per page"),
+    include_total: bool = Query(False, description="Return the total match count in X-Total-Count"),
     property_service: PropertyService = Depends(get_property_service_dep)
 ):
-    """Get all available properties"""
+    """Get a page of available properties"""
     try:
         # Default filter to show only available properties
-        filters = PropertySearchFilters()
-        properties = await property_service.search_properties(filters)
+        filters = PropertySearchFilters(page=page, page_size=page_size)
+        properties, total = await property_service.search_properties(filters, include_total)
+        if total is not None:
+            response.headers["X-Total-Count"] = str(total)
         return properties
         
     except Exception as e:
@@ -117,6 +139,7 @@ async def get_all_properties(
 
 @router.get("/search", response_model=List[Property])
 async def search_properties(
+    response: Response,
     # Map bounds parameters
     ne_lat: Optional[float] = Query(None, description="Northeast latitude"),
     ne_lng: Optional[float] = Query(None, description="Northeast longitude"),
@@ -139,6 +162,11 @@ async def search_properties(
     feature: Optional[str] = Query(None, description="Single feature alias for convenience"),
     status: Optional[List[str]] = Query(None, description="Property status"),
     
+    # Pagination parameters
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(MAX_LIST_RESULTS, ge=1, le=MAX_LIST_RESULTS, description="Properties per page"),
+    include_total: bool = Query(False, description="Return the total match count in X-Total-Count"),
+    
     property_service: PropertyService = Depends(get_property_service_dep)
 ):
     """Search properties with filters"""
@@ -198,10 +226,14 @@ async def search_properties(
             city=city,
             state=state,
             features=feat_list or None,
-            status=status or ["available"]
+            status=status or ["available"],
+            page=page,
+            page_size=page_size
         )
         
-        properties = await property_service.search_properties(filters)
+        properties, total = await property_service.search_properties(filters, include_total)
+        if total is not None:
+            response.headers["X-Total-Count"] = str(total)
         logger.info(f"Property search returned {len(properties)} results")
         return properties
         
@@ -219,14 +251,11 @@ async def get_property_by_id(
 ):
     """Get property by ID"""
     try:
-        print(f"DEBUG: GET route called with property_id: {property_id}")
-        logger.info(f"GET route called with property_id: {property_id}")
+        logger.debug(f"GET route called with property_id: {property_id}")
         
         property = await property_service.get_property_by_id(property_id)
-        print(f"DEBUG: Property service returned: {property is not None}")
         
         if not property:
-            print(f"DEBUG: Property not found for ID: {property_id}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Property not found"
@@ -236,7 +265,6 @@ async def get_property_by_id(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"DEBUG: Exception in GET route: {e}")
         logger.error(f"Error retrieving property {property_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -300,11 +328,13 @@ async def delete_property(
 @router.get("/agent/{agent_id}", response_model=List[Property])
 async def get_agent_properties(
     agent_id: str,
+    skip: int = Query(0, ge=0, description="Number of properties to skip"),
+    limit: int = Query(MAX_LIST_RESULTS, ge=1, le=MAX_LIST_RESULTS, description="Maximum number of properties"),
     property_service: PropertyService = Depends(get_property_service_dep)
 ):
-    """Get all properties for a specific agent"""
+    """Get a page of properties for a specific agent"""
     try:
-        properties = await property_service.get_properties_by_agent(agent_id)
+        properties = await property_service.get_properties_by_agent(agent_id, skip, limit)
         return properties
         
     except Exception as e:
@@ -352,12 +382,14 @@ async def get_nearby_properties(
 
 @router.get("/my/properties", response_model=List[Property])
 async def get_my_properties(
+    skip: int = Query(0, ge=0, description="Number of properties to skip"),
+    limit: int = Query(MAX_LIST_RESULTS, ge=1, le=MAX_LIST_RESULTS, description="Maximum number of properties"),
     current_user: User = Depends(get_current_agent_or_admin_user),
     property_service: PropertyService = Depends(get_property_service_dep)
 ):
-    """Get current user's properties (for agents)"""
+    """Get a page of the current user's properties (for agents)"""
     try:
-        properties = await property_service.get_properties_by_agent(current_user.id)
+        properties = await property_service.get_properties_by_agent(current_user.id, skip, limit)
         return properties
         
     except Exception as e:
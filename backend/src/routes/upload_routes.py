@@ -4,6 +4,7 @@ from models import User, APIResponse, ImageUploadResponse
 from s3_service import get_s3_service, S3Service
 from auth import get_current_agent_or_admin_user
 from config import get_database
+from property_service import invalidate_cached_property
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import logging
 
@@ -60,6 +61,7 @@ async def upload_property_images(
             {"id": property_id},
             {"$set": {"images": all_images}}
         )
+        invalidate_cached_property(property_id)
         
         logger.info(f"Uploaded {len(uploaded_urls)} images for property {property_id} by user {current_user.id}")
         
@@ -121,6 +123,7 @@ async def upload_single_property_image(
             {"id": property_id},
             {"$set": {"images": updated_images}}
         )
+        invalidate_cached_property(property_id)
         
         logger.info(f"Uploaded single image for property {property_id} by user {current_user.id}")
         
@@ -185,6 +188,7 @@ async def delete_property_image(
                 {"id": property_id},
                 {"$set": {"images": updated_images}}
             )
+            invalidate_cached_property(property_id)
             
             logger.info(f"Deleted image from property {property_id} by user {current_user.id}")
             
@@ -273,6 +277,7 @@ async def delete_all_property_images(
             {"id": property_id},
             {"$set": {"images": []}}
         )
+        invalidate_cached_property(property_id)
         
         logger.info(f"Deleted all images for property {property_id} by user {current_user.id}")
         
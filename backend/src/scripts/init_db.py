@@ -11,10 +11,12 @@ This script reads settings from backend/config.py (ENVIRONMENT variables support
 """
 import argparse
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List
 
 from config import get_settings, get_database
+from property_service import add_search_fields, ensure_property_indexes
+from routes.contact_routes import ensure_contact_indexes
 
 
 async def ensure_indexes():
@@ -30,6 +32,12 @@ async def ensure_indexes():
     await db.properties.create_index("bathrooms")
     await db.properties.create_index("square_feet")
     await db.properties.create_index([("coordinates.latitude", 1), ("coordinates.longitude", 1)])
+    # Location/search-field backfill + search and 2dsphere indexes
+    await ensure_property_indexes(db)
+    # Compound indexes for filtered listings, city pages and the projected admin list view
+    await db.properties.create_index([("status", 1), ("price", 1)])
+    await db.properties.create_index([("address.city", 1), ("status", 1)])
+    await db.properties.create_index([("status", 1), ("title", 1), ("price", 1)])
 
     # Contact submissions indexes (help admin page filters)
     await db.contact_submissions.create_index("id", unique=True)
@@ -37,6 +45,8 @@ async def ensure_indexes():
     await db.contact_submissions.create_index("email")
     await db.contact_submissions.create_index("preferred_location")
     await db.contact_submissions.create_index("created_at")
+    # Compound, sort-covering and text indexes behind the admin listings
+    await ensure_contact_indexes(db)
 
     # Inquiries indexes
     await db.inquiries.create_index("id", unique=True)
@@ -49,7 +59,7 @@ async def ensure_indexes():
 
 
 def sample_properties() -> List[dict]:
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     return [
         {
             "id": "seed-apt-1",
@@ -72,6 +82,7 @@ def sample_properties() -> List[dict]:
                 "full_address": "123 Main St, Mumbai, MH 400001",
             },
             "coordinates": {"latitude": 19.1334, "longitude": 72.9133},
+            "location": {"type": "Point", "coordinates": [72.9133, 19.1334]},
             "agent_id": None,
             "created_at": now,
             "updated_at": now,
@@ -97,6 +108,7 @@ def sample_properties() -> List[dict]:
                 "full_address": "45 Green Ave, Pune, MH 411001",
             },
             "coordinates": {"latitude": 18.5204, "longitude": 73.8567},
+            "location": {"type": "Point", "coordinates": [73.8567, 18.5204]},
             "agent_id": None,
             "created_at": now,
             "updated_at": now,
@@ -122,6 +134,7 @@ def sample_properties() -> List[dict]:
                 "full_address": "9 Campus Rd, Jaipur, RJ 302001",
             },
             "coordinates": {"latitude": 26.9124, "longitude": 75.7873},
+            "location": {"type": "Point", "coordinates": [75.7873, 26.9124]},
             "agent_id": None,
             "created_at": now,
             "updated_at": now,
@@ -136,7 +149,7 @@ async def seed_data():
     for p in props:
         existing = await db.properties.find_one({"id": p["id"]})
         if not existing:
-            await db.properties.insert_one(p)
+            await db.properties.insert_one(add_search_fields(p))
             inserted += 1
     print(f"[init-db] Seeded properties: {inserted} new, {len(props) - inserted} skipped (already exist).")
 
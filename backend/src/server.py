@@ -1,16 +1,23 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Import configuration
-from config import get_settings, get_cors_origins
+from config import get_settings, get_cors_origins, get_database
+from db_client import close_client
+from auth import ensure_user_indexes, start_hash_pool, shutdown_hash_pool
+from email_service import start_email_workers, close_email_service
+from maps_service import get_maps_service, close_maps_service, warm_haversine
+from property_service import ensure_property_indexes
+from routes.contact_routes import ensure_contact_indexes
 
 # Import routes
 from routes.auth_routes import router as auth_router
@@ -30,15 +37,15 @@ logger = logging.getLogger(__name__)
 # Get settings
 settings = get_settings()
 
-# MongoDB connection
-client = AsyncIOMotorClient(settings.mongo_url)
-db = client[settings.db_name]
+# MongoDB connection, shared with the request dependencies
+db = get_database()
 
 # Create the main app
 app = FastAPI(
     title="ROR STAY Real Estate API",
     description="A comprehensive real estate platform API with property management, user authentication, and third-party integrations.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Create a router with the /api prefix
@@ -48,7 +55,7 @@ api_router = APIRouter(prefix="/api")
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class StatusCheckCreate(BaseModel):
     client_name: str
@@ -104,6 +111,7 @@ app.add_middleware(
     allow_origins=get_cors_origins(),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
 # Root endpoint
@@ -130,14 +138,53 @@ async def startup_db_client():
     logger.info(f"Database: {settings.db_name}")
     logger.info(f"Environment: {settings.environment}")
     
+    # Password hashing runs in worker processes, off the event loop
+    start_hash_pool()
+    
+    # Build the maps client inside the running loop so its connection pool is bound to it
+    get_maps_service()
+    
+    # Notification emails are sent by queue workers that live as long as the app
+    start_email_workers()
+    
+    # Compile the numba distance kernel now rather than inside the first request
+    try:
+        await asyncio.to_thread(warm_haversine)
+    except Exception as e:
+        logger.error(f"Failed to compile distance kernel: {e}")
+    
     # Test database connection
     try:
         await db.command("ping")
         logger.info("Database connection successful")
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
+    
+    # Ensure indexes used by authentication lookups
+    try:
+        await ensure_user_indexes(db)
+        logger.info("User indexes ensured")
+    except Exception as e:
+        logger.error(f"Failed to ensure user indexes: {e}")
+    
+    # Ensure the indexes behind property searches
+    try:
+        await ensure_property_indexes(db)
+        logger.info("Property indexes ensured")
+    except Exception as e:
+        logger.error(f"Failed to ensure property indexes: {e}")
+    
+    # Ensure the indexes behind the contact and inquiry listings
+    try:
+        await ensure_contact_indexes(db)
+        logger.info("Contact indexes ensured")
+    except Exception as e:
+        logger.error(f"Failed to ensure contact indexes: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     logger.info("Shutting down ROR STAY Real Estate API")
-    client.close()
+    shutdown_hash_pool()
+    await close_email_service()
+    await close_maps_service()
+    close_client()
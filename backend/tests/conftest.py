@@ -0,0 +1,131 @@
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+# The backend modules import each other as top-level modules from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from models import User, UserRole
+
+
+class FakeCursor:
+    """Chainable stand-in for a Motor cursor / aggregate result"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.sorted_by = None
+        self.skipped = 0
+        self.limited = None
+
+    def sort(self, *args, **kwargs):
+        self.sorted_by = args
+        return self
+
+    def skip(self, count):
+        self.skipped = count
+        return self
+
+    def limit(self, count):
+        self.limited = count
+        return self
+
+    def batch_size(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(doc) for doc in self.docs]
+
+
+class FakeCollection:
+    """Records the calls made against it and answers from canned documents"""
+
+    def __init__(self, docs=None, aggregate_result=None):
+        self.docs = docs or []
+        self.aggregate_result = aggregate_result
+        self.calls = []
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def find_one(self, query, projection=None):
+        self.calls.append(("find_one", query))
+        return dict(self.docs[0]) if self.docs else None
+
+    def find(self, query=None, projection=None, **kwargs):
+        self.calls.append(("find", query, kwargs))
+        self.cursor = FakeCursor(self.docs)
+        return self.cursor
+
+    def aggregate(self, pipeline, **kwargs):
+        self.calls.append(("aggregate", pipeline))
+        return FakeCursor(self.aggregate_result if self.aggregate_result is not None else self.docs)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.calls.append(("find_one_and_update", query, update))
+        if not self.docs:
+            return None
+        return {**self.docs[0], **update["$set"]}
+
+    async def delete_one(self, query):
+        self.calls.append(("delete_one", query))
+        return SimpleNamespace(deleted_count=1 if self.docs else 0)
+
+    async def insert_one(self, doc):
+        self.calls.append(("insert_one", doc))
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append(("insert_many", docs, ordered))
+
+    async def count_documents(self, query, **kwargs):
+        self.calls.append(("count_documents", query))
+        return len(self.docs)
+
+    def calls_named(self, name):
+        return [call for call in self.calls if call[0] == name]
+
+
+class FakeDB:
+    def __init__(self, **collections):
+        for name in ("properties", "users", "contact_submissions", "inquiries"):
+            setattr(self, name, collections.get(name, FakeCollection()))
+
+
+def make_user(role=UserRole.AGENT, user_id="agent-1"):
+    now = datetime(2024, 1, 1)
+    return User(
+        id=user_id, email=f"{user_id}@example.com", first_name="Test", last_name="User",
+        role=role, created_at=now, updated_at=now
+    )
+
+
+def make_property_doc(**overrides):
+    doc = {
+        "id": "prop-1",
+        "title": "Test Home",
+        "property_type": "house",
+        "status": "available",
+        "price": 500000,
+        "features": ["Pool"],
+        "images": [],
+        "address": {
+            "street": "1 Main St", "city": "Austin", "state": "TX", "zip_code": "78701",
+            "country": "United States", "full_address": "1 Main St, Austin, TX 78701",
+        },
+        "coordinates": {"latitude": 30.27, "longitude": -97.74},
+        "created_at": datetime(2024, 1, 1, 12, 0, 0, 250000),
+        "updated_at": datetime(2024, 1, 1, 12, 0, 0, 250000),
+        "agent_id": "agent-1",
+    }
+    doc.update(overrides)
+    return doc
+
+
+@pytest.fixture(autouse=True)
+def clear_property_cache():
+    import property_service
+    property_service._property_cache.clear()
+    yield
+    property_service._property_cache.clear()
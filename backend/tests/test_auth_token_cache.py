@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+import auth
+from auth import create_access_token, get_current_user, invalidate_user_tokens
+from models import UserInDB, UserRole
+
+
+class FakeUsers:
+    def __init__(self, doc):
+        self.doc = doc
+        self.lookups = 0
+
+    async def find_one(self, query, projection=None):
+        self.lookups += 1
+        return dict(self.doc)
+
+
+class FakeDB:
+    def __init__(self, doc):
+        self.users = FakeUsers(doc)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth._token_cache.clear()
+    auth._user_token_keys.clear()
+    yield
+    auth._token_cache.clear()
+    auth._user_token_keys.clear()
+
+
+@pytest.fixture
+def db():
+    now = datetime(2024, 1, 1)
+    return FakeDB(UserInDB(
+        id="user-1", email="jane@example.com", first_name="Jane", last_name="Doe",
+        role=UserRole.USER, hashed_password="x", created_at=now, updated_at=now
+    ).model_dump())
+
+
+def bearer(email):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": email}))
+
+
+@pytest.mark.asyncio
+async def test_repeated_token_skips_the_user_lookup(db):
+    credentials = bearer("jane@example.com")
+
+    first = await get_current_user(credentials, db)
+    second = await get_current_user(credentials, db)
+
+    assert first.email == second.email == "jane@example.com"
+    assert db.users.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_by_token_digest_not_raw_token(db):
+    credentials = bearer("jane@example.com")
+
+    await get_current_user(credentials, db)
+
+    assert credentials.credentials.encode() not in auth._token_cache
+    assert all(len(key) == 16 for key in auth._token_cache)
+
+
+@pytest.mark.asyncio
+async def test_invalidation_forces_a_fresh_lookup(db):
+    credentials = bearer("jane@example.com")
+    await get_current_user(credentials, db)
+
+    invalidate_user_tokens("jane@example.com")
+    await get_current_user(credentials, db)
+
+    assert db.users.lookups == 2
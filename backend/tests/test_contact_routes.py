@@ -0,0 +1,191 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from auth import get_current_admin_user
+from config import get_database
+from email_service import get_email_service
+from models import UserRole
+from routes import contact_routes
+
+from conftest import FakeCollection, FakeDB, make_user
+
+
+class FakeEmailService:
+    def __init__(self):
+        self.sent = []
+
+    def send_contact_form_notification(self, background_tasks, contact_data):
+        self.sent.append(contact_data)
+
+
+@pytest.fixture
+def db():
+    return FakeDB()
+
+
+@pytest.fixture
+def email_service():
+    return FakeEmailService()
+
+
+@pytest.fixture
+def client(db, email_service):
+    app = FastAPI()
+    app.include_router(contact_routes.router)
+    app.dependency_overrides[get_database] = lambda: db
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    app.dependency_overrides[get_current_admin_user] = lambda: make_user(role=UserRole.ADMIN, user_id="admin-1")
+    return TestClient(app)
+
+
+VALID_SUBMISSION = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "phone": "(512) 555-0100",
+    "message": "Interested in a viewing",
+}
+
+
+def test_honeypot_is_dropped_before_validation(client, db, email_service):
+    # Otherwise-invalid body: the honeypot alone decides the outcome
+    response = client.post("/contact/submit", json={"website": "http://spam.example", "email": "nope"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "received"
+    assert not db.contact_submissions.calls_named("insert_one")
+    assert email_service.sent == []
+
+
+def test_valid_submission_is_stored_with_normalized_phone(client, db, email_service):
+    response = client.post("/contact/submit", json=VALID_SUBMISSION)
+
+    assert response.status_code == 200
+    (_, doc), = db.contact_submissions.calls_named("insert_one")
+    assert doc["phone"] == "5125550100"
+    assert len(email_service.sent) == 1
+
+
+def test_invalid_submission_reports_body_locations(client, db):
+    response = client.post("/contact/submit", json={**VALID_SUBMISSION, "phone": "123"})
+
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "phone"]]
+    assert not db.contact_submissions.calls_named("insert_one")
+
+
+def test_malformed_json_is_a_422(client):
+    response = client.post("/contact/submit", content=b"{not json", headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+
+def test_public_submissions_keep_every_key(client, db):
+    db.contact_submissions = FakeCollection([{"_id": ObjectId("65a000000000000000000001"), "name": "Jane"}])
+
+    response = client.get("/contact/submissions/public")
+
+    submission, = response.json()
+    assert submission["id"] == "65a000000000000000000001"
+    assert set(submission) == set(contact_routes._PUBLIC_SUBMISSION_FIELDS)
+    assert submission["email"] is None
+
+
+def test_bare_end_date_covers_the_whole_day():
+    assert contact_routes._parse_range_bound("2024-01-31", end=True) == datetime(2024, 1, 31, 23, 59, 59, 999999)
+
+
+def test_bare_start_date_starts_at_midnight():
+    assert contact_routes._parse_range_bound("2024-01-01", end=False) == datetime(2024, 1, 1)
+
+
+def test_end_bound_with_a_time_is_kept_as_given():
+    assert contact_routes._parse_range_bound("2024-01-31T12:30:00", end=True) == datetime(2024, 1, 31, 12, 30)
+
+
+def test_unparseable_date_bound_raises_value_error():
+    with pytest.raises(ValueError):
+        contact_routes._parse_range_bound("yesterday", end=False)
+
+
+def test_submissions_page_and_total_come_from_find_and_count(client, db):
+    db.contact_submissions = FakeCollection([{"_id": ObjectId(), "name": "Jane"}])
+
+    response = client.get("/contact/submissions", params={"skip": 20, "limit": 10, "status_filter": "new"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "1"
+    assert [doc["name"] for doc in response.json()] == ["Jane"]
+    (_, query, _), = db.contact_submissions.calls_named("find")
+    assert query == {"status": "new"}
+    assert db.contact_submissions.calls_named("count_documents") == [("count_documents", {"status": "new"})]
+    cursor = db.contact_submissions.cursor
+    assert (cursor.sorted_by, cursor.skipped, cursor.limited) == (("created_at", -1), 20, 10)
+    assert not db.contact_submissions.calls_named("aggregate")
+
+
+def test_submissions_total_is_zero_when_nothing_matches(client, db):
+    response = client.get("/contact/submissions")
+
+    assert response.json() == []
+    assert response.headers["X-Total-Count"] == "0"
+
+
+class TextMissCollection(FakeCollection):
+    """Answers nothing for $text queries, like a search term that is only part of a word"""
+
+    def find(self, query=None, projection=None, **kwargs):
+        cursor = super().find(query, projection, **kwargs)
+        if "$text" in query:
+            cursor.docs = []
+        return cursor
+
+    async def count_documents(self, query, **kwargs):
+        return 0 if "$text" in query else await super().count_documents(query, **kwargs)
+
+
+def search_queries(db):
+    return [(query, kwargs.get("collation")) for _, query, kwargs in db.contact_submissions.calls_named("find")]
+
+
+@pytest.mark.parametrize("q, digits", [("512", "512"), ("(512) 555-01", "51255501")])
+def test_phone_like_search_is_a_digit_prefix(client, db, q, digits):
+    client.get("/contact/submissions", params={"q": q})
+
+    assert search_queries(db) == [({"phone": {"$regex": f"^{digits}"}}, None)]
+
+
+def test_word_search_uses_text_index_only_when_it_matches(client, db):
+    db.contact_submissions = FakeCollection([{"_id": ObjectId(), "name": "Jane Doe"}])
+
+    response = client.get("/contact/submissions", params={"q": "jane"})
+
+    assert len(response.json()) == 1
+    assert search_queries(db) == [({"$text": {"$search": "jane"}}, None)]
+
+
+def test_partial_word_falls_back_to_a_case_insensitive_name_or_email_prefix(client, db):
+    db.contact_submissions = TextMissCollection([{"_id": ObjectId(), "name": "John Smith"}])
+
+    response = client.get("/contact/submissions", params={"q": "Joh.", "status_filter": "new"})
+
+    assert [doc["name"] for doc in response.json()] == ["John Smith"]
+    assert response.headers["X-Total-Count"] == "1"
+    prefix = {"$regex": r"^Joh\.", "$options": "i"}
+    assert search_queries(db)[1] == (
+        {"status": "new", "$or": [{"name": prefix}, {"email": prefix}]},
+        {"locale": "en", "strength": 2},
+    )
+
+
+def test_prefix_indexes_share_the_fallback_collation():
+    collated = [
+        index.document for index in contact_routes.CONTACT_SUBMISSION_INDEXES if "collation" in index.document
+    ]
+
+    assert [list(index["key"]) for index in collated] == [["name"], ["email"]]
+    assert all(index["collation"] == contact_routes._CASE_INSENSITIVE for index in collated)
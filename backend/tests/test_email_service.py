@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks
+
+import email_service
+from email_service import EmailService
+from models import ContactSubmission
+
+
+def make_submission(name):
+    return ContactSubmission(name=name, email="jane@example.com", phone="5125550100", message="Hi")
+
+
+def test_without_workers_notifications_fall_back_to_background_tasks():
+    service = EmailService()
+    background_tasks = BackgroundTasks()
+
+    service.send_contact_form_notification(background_tasks, make_submission("Jane"))
+
+    assert len(background_tasks.tasks) == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_notifications_are_sent_by_workers_and_drained_on_close():
+    service = EmailService()
+    sent = []
+
+    async def fake_send(contact_data):
+        await asyncio.sleep(0)
+        sent.append(contact_data.name)
+
+    service._send_contact_form_notification_impl = fake_send
+    service.start_workers()
+    background_tasks = BackgroundTasks()
+    for i in range(5):
+        service.send_contact_form_notification(background_tasks, make_submission(str(i)))
+
+    await service.aclose()
+
+    assert sorted(sent) == ["0", "1", "2", "3", "4"]
+    assert background_tasks.tasks == []
+
+
+@pytest.mark.asyncio
+async def test_full_queue_falls_back_and_logs(monkeypatch, caplog):
+    monkeypatch.setattr(email_service, "EMAIL_QUEUE_MAX_SIZE", 1)
+    monkeypatch.setattr(email_service, "EMAIL_WORKER_COUNT", 0)
+    monkeypatch.setattr(email_service, "EMAIL_DRAIN_TIMEOUT_SECONDS", 0.01)
+    service = EmailService()
+    service.start_workers()
+    background_tasks = BackgroundTasks()
+
+    service.send_contact_form_notification(background_tasks, make_submission("queued"))
+    service.send_contact_form_notification(background_tasks, make_submission("overflow"))
+
+    assert len(background_tasks.tasks) == 1
+    assert "Email queue full" in caplog.text
+    await service.aclose()
+
+
+@pytest.mark.asyncio
+async def test_drain_timeout_logs_undelivered_jobs(monkeypatch, caplog):
+    monkeypatch.setattr(email_service, "EMAIL_DRAIN_TIMEOUT_SECONDS", 0.01)
+    service = EmailService()
+
+    async def never_finishes(contact_data):
+        await asyncio.sleep(10)
+
+    service._send_contact_form_notification_impl = never_finishes
+    service.start_workers()
+    for i in range(6):
+        service.send_contact_form_notification(BackgroundTasks(), make_submission(str(i)))
+    await asyncio.sleep(0)
+
+    await service.aclose()
+
+    assert "6 notification jobs undelivered" in caplog.text
@@ -0,0 +1,67 @@
+import io
+import os
+import time
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+import image_service
+from image_service import ImageService
+
+JPEG_HEADER = b"\xff\xd8\xff"
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(image_service.os, "makedirs", lambda *args, **kwargs: None)
+        service = ImageService()
+    service.upload_dir = str(tmp_path)
+    return service
+
+
+def upload(name, body):
+    return UploadFile(io.BytesIO(JPEG_HEADER + body), filename=name)
+
+
+@pytest.mark.asyncio
+async def test_upload_stores_every_image(service, tmp_path):
+    def fake_optimize(source, output_path):
+        with open(output_path, "wb") as out:
+            out.write(source.read())
+
+    service._optimize_image = fake_optimize
+
+    urls = await service.upload_images([upload("a.jpg", b"a"), upload("b.png", b"b")], "prop-1")
+
+    assert len(urls) == 2
+    assert all(url.startswith("/api/images/prop-1/") for url in urls)
+    assert len(os.listdir(tmp_path / "prop-1")) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_image_waits_for_other_workers_and_removes_their_files(service, tmp_path):
+    finished = []
+
+    def fake_optimize(source, output_path):
+        body = source.read()
+        if body.endswith(b"bad"):
+            with open(output_path, "wb") as out:
+                out.write(b"partial")
+            raise OSError("corrupt image")
+        # Still reading and writing after the failing image has raised
+        time.sleep(0.2)
+        source.seek(0)
+        with open(output_path, "wb") as out:
+            out.write(source.read())
+        finished.append(output_path)
+
+    service._optimize_image = fake_optimize
+    files = [upload("a.jpg", b"slow"), upload("b.jpg", b"bad"), upload("c.jpg", b"slow")]
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.upload_images(files, "prop-1")
+
+    assert exc_info.value.status_code == 500
+    assert len(finished) == 2
+    assert os.listdir(tmp_path / "prop-1") == []
@@ -0,0 +1,25 @@
+import pytest
+
+import maps_service
+
+
+@pytest.fixture
+def cold_kernel(monkeypatch):
+    monkeypatch.setattr(maps_service, "_haversine_miles_jit", None)
+
+
+def test_warm_haversine_builds_the_kernel_up_front(cold_kernel):
+    maps_service.warm_haversine()
+
+    assert maps_service._haversine_miles_jit is not None
+    assert maps_service._haversine_miles_nb(30.27, -97.74, 29.76, -95.37) == pytest.approx(
+        maps_service._haversine_miles(30.27, -97.74, 29.76, -95.37)
+    )
+
+
+def test_without_numba_the_python_haversine_is_used(cold_kernel, monkeypatch):
+    monkeypatch.setattr(maps_service, "NUMBA_AVAILABLE", False)
+
+    maps_service.warm_haversine()
+
+    assert maps_service._haversine_miles_jit is maps_service._haversine_miles
@@ -0,0 +1,32 @@
+import pytest
+
+import auth
+from auth import get_password_hash, shutdown_hash_pool, start_hash_pool, verify_password
+from config import PASSWORD_HASH_WORKERS
+
+
+@pytest.fixture
+def hash_pool():
+    start_hash_pool()
+    yield auth._hash_pool
+    shutdown_hash_pool()
+
+
+def test_pool_is_capped_and_does_not_fork(hash_pool):
+    assert hash_pool._max_workers == PASSWORD_HASH_WORKERS
+    assert hash_pool._mp_context.get_start_method() in ("forkserver", "spawn")
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip_through_the_pool(hash_pool):
+    hashed = await get_password_hash("s3cret-pass")
+
+    assert hashed.startswith("$argon2id$")
+    assert await verify_password("s3cret-pass", hashed)
+    assert not await verify_password("wrong-pass", hashed)
+
+
+def test_shutdown_clears_the_pool(hash_pool):
+    shutdown_hash_pool()
+
+    assert auth._hash_pool is None
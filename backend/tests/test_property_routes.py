@@ -0,0 +1,57 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from auth import get_current_agent_or_admin_user
+from property_service import MAX_LIST_RESULTS, PropertyService
+from routes import property_routes
+
+from conftest import FakeCollection, FakeDB, make_user
+
+
+@pytest.fixture
+def properties():
+    return FakeCollection(aggregate_result=[])
+
+
+@pytest.fixture
+def client(properties):
+    app = FastAPI()
+    app.include_router(property_routes.router)
+    app.dependency_overrides[property_routes.get_property_service_dep] = (
+        lambda: PropertyService(FakeDB(properties=properties), None)
+    )
+    app.dependency_overrides[get_current_agent_or_admin_user] = lambda: make_user()
+    return TestClient(app)
+
+
+def page_stages(properties):
+    (_, pipeline), = properties.calls_named("aggregate")
+    return pipeline[2], pipeline[3]
+
+
+def test_my_properties_returns_every_listing_by_default(client, properties):
+    response = client.get("/properties/my/properties")
+
+    assert response.status_code == 200
+    assert page_stages(properties) == ({"$skip": 0}, {"$limit": MAX_LIST_RESULTS})
+
+
+def test_my_properties_pages_when_asked(client, properties):
+    client.get("/properties/my/properties", params={"skip": 20, "limit": 10})
+
+    assert page_stages(properties) == ({"$skip": 20}, {"$limit": 10})
+
+
+@pytest.mark.parametrize("path", ["/properties/", "/properties/search"])
+def test_property_lists_return_up_to_the_old_cap_by_default(client, properties, path):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert page_stages(properties) == ({"$skip": 0}, {"$limit": MAX_LIST_RESULTS})
+
+
+def test_property_list_pages_when_asked(client, properties):
+    client.get("/properties/", params={"page": 3, "page_size": 25})
+
+    assert page_stages(properties) == ({"$skip": 50}, {"$limit": 25})
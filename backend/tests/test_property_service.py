@@ -0,0 +1,288 @@
+import re
+
+import pytest
+from fastapi import HTTPException
+
+import property_service
+from models import Address, Coordinates, MapBounds, PropertyCreate, PropertySearchFilters, PropertyUpdate, UserRole
+from property_service import PropertyService, _build_query
+
+from conftest import FakeCollection, FakeDB, make_property_doc, make_user
+
+
+class FakeMaps:
+    def __init__(self, coordinates=None):
+        self.coordinates = coordinates
+        self.geocoded = []
+
+    async def geocode_address(self, address):
+        self.geocoded.append(address)
+        return self.coordinates
+
+    async def geocode_addresses(self, addresses):
+        self.geocoded.extend(addresses)
+        return [self.coordinates for _ in addresses]
+
+
+def make_service(docs, maps=None):
+    properties = FakeCollection(docs)
+    return PropertyService(FakeDB(properties=properties), maps or FakeMaps()), properties
+
+
+def test_build_query_defaults_to_available_listings_only():
+    assert _build_query(PropertySearchFilters()) == {"status": {"$in": ["available"]}}
+
+
+def test_build_query_treats_zero_range_bounds_as_unset():
+    query = _build_query(PropertySearchFilters(min_price=0, max_price=500000, min_bedrooms=0, max_bedrooms=0))
+
+    assert query["price"] == {"$lte": 500000}
+    assert "bedrooms" not in query
+
+
+def test_build_query_keeps_both_range_bounds():
+    query = _build_query(PropertySearchFilters(min_bedrooms=2, max_bedrooms=4, min_bathrooms=1.5))
+
+    assert query["bedrooms"] == {"$gte": 2, "$lte": 4}
+    assert query["bathrooms"] == {"$gte": 1.5}
+
+
+def test_build_query_matches_features_on_sorted_lowercase_copies():
+    query = _build_query(PropertySearchFilters(features=["Pool", "GARAGE", "pool", "Garden"]))
+
+    assert query["features_lc"] == {"$all": ["garage", "garden", "pool"]}
+
+
+def test_build_query_matches_city_and_state_exactly_on_lowercase_fields():
+    query = _build_query(PropertySearchFilters(city="Austin", state="TX"))
+
+    assert query["address.city_lc"] == "austin"
+    assert query["address.state_lc"] == "tx"
+    assert "address.city" not in query
+
+
+def test_build_query_limits_coordinates_to_the_map_bounds():
+    bounds = MapBounds(
+        northeast=Coordinates(latitude=30.5, longitude=-97.5),
+        southwest=Coordinates(latitude=30.0, longitude=-98.0),
+    )
+
+    query = _build_query(PropertySearchFilters(bounds=bounds))
+
+    assert query["coordinates.latitude"] == {"$gte": 30.0, "$lte": 30.5}
+    assert query["coordinates.longitude"] == {"$gte": -98.0, "$lte": -97.5}
+
+
+@pytest.mark.asyncio
+async def test_relaxed_feature_retry_uses_compiled_regexes():
+    properties = FakeCollection(aggregate_result=[])
+    service = PropertyService(FakeDB(properties=properties), FakeMaps())
+
+    await service.search_properties(PropertySearchFilters(features=["Pool", "a.c"]))
+
+    first, relaxed = [call[1][0]["$match"] for call in properties.calls_named("aggregate")]
+    assert first["features_lc"] == {"$all": ["a.c", "pool"]}
+    patterns = relaxed["features_lc"]["$all"]
+    assert all(isinstance(pattern, re.Pattern) for pattern in patterns)
+    assert [pattern.pattern for pattern in patterns] == [re.escape("a.c"), "pool"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_geocodes_missing_coordinates_and_inserts_unordered():
+    maps = FakeMaps(Coordinates(latitude=30.0, longitude=-97.0))
+    service, properties = make_service([], maps)
+    address = Address(street="1 Main St", city="Austin", state="TX", zip_code="78701")
+    base = dict(title="Home", property_type="house", status="available", price=100, address=address)
+    items = [
+        PropertyCreate(**base),
+        PropertyCreate(**base, coordinates=Coordinates(latitude=1.0, longitude=2.0)),
+    ]
+
+    created = await service.create_properties_bulk(items, make_user())
+
+    (_, docs, ordered), = properties.calls_named("insert_many")
+    assert ordered is False
+    assert maps.geocoded == ["1 Main St, Austin, TX 78701"]
+    assert [doc["location"]["coordinates"] for doc in docs] == [[-97.0, 30.0], [2.0, 1.0]]
+    assert all(doc["agent_id"] == "agent-1" for doc in docs)
+    assert docs[0]["address"]["full_address"] == "1 Main St, Austin, TX 78701"
+    assert len(created) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_requires_agent_or_admin():
+    service, properties = make_service([])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.create_properties_bulk([], make_user(role=UserRole.USER))
+
+    assert exc_info.value.status_code == 403
+    assert not properties.calls_named("insert_many")
+
+
+@pytest.mark.asyncio
+async def test_delete_keeps_ownership_in_the_filter():
+    service, properties = make_service([make_property_doc()])
+
+    assert await service.delete_property("prop-1", make_user())
+
+    (_, query), = properties.calls_named("delete_one")
+    assert query == {"id": "prop-1", "agent_id": "agent-1"}
+
+
+@pytest.mark.asyncio
+async def test_delete_authorizes_against_the_stored_owner_not_the_cache():
+    service, properties = make_service([make_property_doc()])
+    await service.get_property_by_id("prop-1")
+    properties.docs = [make_property_doc(agent_id="someone-else")]
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.delete_property("prop-1", make_user())
+
+    assert exc_info.value.status_code == 403
+    assert not properties.calls_named("delete_one")
+
+
+@pytest.mark.asyncio
+async def test_delete_of_missing_property_is_a_404():
+    service, properties = make_service([])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.delete_property("prop-1", make_user(role=UserRole.ADMIN))
+
+    assert exc_info.value.status_code == 404
+    assert not properties.calls_named("delete_one")
+
+
+@pytest.mark.asyncio
+async def test_cached_property_is_copied_per_caller():
+    service, properties = make_service([make_property_doc()])
+
+    first = await service.get_property_by_id("prop-1")
+    first.features.append("Mutated")
+    first.price = 1
+    second = await service.get_property_by_id("prop-1")
+
+    assert len(properties.calls_named("find_one")) == 1
+    assert second.features == ["Pool"]
+    assert second.price == 500000
+
+
+@pytest.mark.asyncio
+async def test_expired_cache_entry_is_read_again():
+    service, properties = make_service([make_property_doc()])
+
+    await service.get_property_by_id("prop-1")
+    _, cached = property_service._property_cache["prop-1"]
+    property_service._property_cache["prop-1"] = (0.0, cached)
+    await service.get_property_by_id("prop-1")
+
+    assert len(properties.calls_named("find_one")) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_property_hydrates_stored_datetimes_unchanged():
+    service, _ = make_service([make_property_doc()])
+
+    result = await service.get_property_by_id("prop-1")
+
+    assert result.created_at.microsecond == 250000
+    assert result.address.full_address == "1 Main St, Austin, TX 78701"
+
+
+@pytest.mark.asyncio
+async def test_list_hydration_falls_back_to_the_object_id_and_skips_incomplete_docs():
+    incomplete = make_property_doc(id=None, _id="65a000000000000000000002")
+    del incomplete["coordinates"]
+    properties = FakeCollection(docs=[make_property_doc(id=None, _id="65a000000000000000000001"), incomplete])
+    service = PropertyService(FakeDB(properties=properties), FakeMaps())
+
+    result = await service.get_nearby_properties(Coordinates(latitude=30.27, longitude=-97.74))
+
+    assert [prop.id for prop in result] == ["65a000000000000000000001"]
+
+
+@pytest.mark.asyncio
+async def test_update_with_no_changes_skips_the_write():
+    service, properties = make_service([make_property_doc()])
+
+    result = await service.update_property("prop-1", PropertyUpdate(price=500000), make_user())
+
+    assert result.price == 500000
+    assert not properties.calls_named("find_one_and_update")
+
+
+@pytest.mark.asyncio
+async def test_update_sets_only_changed_fields():
+    service, properties = make_service([make_property_doc()])
+
+    result = await service.update_property("prop-1", PropertyUpdate(price=550000, title="Test Home"), make_user())
+
+    (_, query, update), = properties.calls_named("find_one_and_update")
+    assert sorted(update["$set"]) == ["price", "updated_at"]
+    assert query["agent_id"] == "agent-1"
+    assert result.price == 550000
+
+
+@pytest.mark.asyncio
+async def test_update_address_change_regeocodes_and_sets_location():
+    maps = FakeMaps(Coordinates(latitude=30.3, longitude=-97.7))
+    service, properties = make_service([make_property_doc()], maps)
+    new_address = Address(street="2 Oak Ave", city="Austin", state="TX", zip_code="78702")
+
+    result = await service.update_property("prop-1", PropertyUpdate(address=new_address), make_user())
+
+    (_, _, update), = properties.calls_named("find_one_and_update")
+    assert maps.geocoded == ["2 Oak Ave, Austin, TX 78702"]
+    assert update["$set"]["location"] == {"type": "Point", "coordinates": [-97.7, 30.3]}
+    assert update["$set"]["address"]["city_lc"] == "austin"
+    assert result.coordinates.latitude == 30.3
+
+
+@pytest.mark.asyncio
+async def test_update_other_agents_property_is_forbidden():
+    service, properties = make_service([make_property_doc(agent_id="someone-else")])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.update_property("prop-1", PropertyUpdate(price=1), make_user())
+
+    assert exc_info.value.status_code == 403
+    assert not properties.calls_named("find_one_and_update")
+
+
+@pytest.mark.asyncio
+async def test_update_incomplete_stored_property_returns_422_without_writing():
+    doc = make_property_doc()
+    del doc["coordinates"]
+    service, properties = make_service([doc])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.update_property("prop-1", PropertyUpdate(price=1), make_user())
+
+    assert exc_info.value.status_code == 422
+    assert not properties.calls_named("find_one_and_update")
+
+
+@pytest.mark.asyncio
+async def test_update_supplying_the_missing_field_goes_through():
+    doc = make_property_doc()
+    del doc["coordinates"]
+    service, properties = make_service([doc])
+
+    result = await service.update_property(
+        "prop-1", PropertyUpdate(coordinates=Coordinates(latitude=30.0, longitude=-97.0)), make_user()
+    )
+
+    assert properties.calls_named("find_one_and_update")
+    assert result.coordinates.longitude == -97.0
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_cached_property():
+    service, _ = make_service([make_property_doc()])
+    await service.get_property_by_id("prop-1")
+    assert "prop-1" in property_service._property_cache
+
+    await service.update_property("prop-1", PropertyUpdate(price=600000), make_user())
+
+    assert "prop-1" not in property_service._property_cache